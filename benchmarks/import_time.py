@@ -0,0 +1,75 @@
+"""
+Import-time benchmark for the tmdb package.
+
+Runs ``import tmdb`` in fresh interpreters, reports the median cumulative import time taken from ``-X importtime``
+and exits with a non-zero status if the median exceeds the budget or if a heavy dependency was imported eagerly.
+
+Usage: python benchmarks/import_time.py [--runs 15] [--budget-ms 10]
+"""
+
+import argparse
+import os
+import pathlib
+import re
+import statistics
+import subprocess
+import sys
+
+# dependencies that must only be imported on first use
+HEAVY_MODULES = ("requests", "bs4", "urllib3")
+
+ROOT = pathlib.Path(__file__).parent.parent.resolve()
+
+# measure with a bytecode cache, as an installed package would be imported
+ENVIRONMENT = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+
+
+def measure() -> tuple:
+    """
+    Imports tmdb in a fresh interpreter.
+
+    :return: Cumulative import time of tmdb in microseconds and the heavy modules that were imported.
+    """
+
+    code = f"import sys, tmdb; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             cwd=ROOT, env=ENVIRONMENT, capture_output=True, text=True, check=True)
+
+    match = re.search(r"import time:\s+\d+ \|\s+(\d+) \| tmdb$", process.stderr, flags=re.MULTILINE)
+    loaded = [module for module in process.stdout.strip().split(",") if module]
+
+    return int(match.group(1)), loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    # first run writes the bytecode cache and is not counted
+    measure()
+
+    timings, loaded = [], set()
+    for _ in range(args.runs):
+        microseconds, modules = measure()
+        timings.append(microseconds / 1000)
+        loaded.update(modules)
+
+    median = statistics.median(timings)
+    print(f"import tmdb: median {median:.2f} ms, min {min(timings):.2f} ms, max {max(timings):.2f} ms "
+          f"({args.runs} runs, budget {args.budget_ms:.2f} ms)")
+
+    if loaded:
+        print(f"FAIL: heavy dependencies imported eagerly: {', '.join(sorted(loaded))}")
+        return 1
+
+    if median > args.budget_ms:
+        print("FAIL: import time exceeds budget")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
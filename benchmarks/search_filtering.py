@@ -0,0 +1,115 @@
+"""
+Search filtering benchmark for the tmdb package.
+
+Serves recorded-style search pages from a local stand-in server and compares a recursive search of the mixed "/search"
+pages filtered afterwards with a category- and year-scoped search. Reports the pages fetched, the entries created and
+the wall time of both.
+
+Usage: python benchmarks/search_filtering.py [--movies 60] [--tv 140] [--runs 5]
+"""
+
+import argparse
+import pathlib
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+import tmdb  # noqa: E402
+
+from tmdb import _extract  # noqa: E402
+from tmdb.tests import fixtures  # noqa: E402
+
+# cards per search result page, as served by TMDb
+PAGE_SIZE = 20
+
+YEAR = "1999"
+
+
+def cards(movies: int, tv: int) -> tuple:
+    """
+    Builds the search result cards: movies released in one of ten years, interleaved with TV series.
+
+    :return: Tuple of all cards (as on the mixed page) and the movie cards (as on the movie page).
+    """
+
+    movie_cards = [fixtures.search_card("movie", str(number), f"Movie {number}", release_date=str(1990 + number % 10),
+                                        description="A movie.", poster_id=f"poster{number}")
+                   for number in range(1, movies + 1)]
+    tv_cards = [fixtures.search_card("tv", str(number), f"Series {number}", release_date=str(1990 + number % 10),
+                                     description="A series.", poster_id=f"poster{number}")
+                for number in range(1, tv + 1)]
+
+    mixed = [card for pair in zip(tv_cards, movie_cards) for card in pair]
+    mixed += tv_cards[len(movie_cards):] + movie_cards[len(tv_cards):]
+
+    return mixed, movie_cards
+
+
+def pages(page_cards: list) -> list:
+    chunks = [page_cards[start:start + PAGE_SIZE] for start in range(0, len(page_cards), PAGE_SIZE)] or [[]]
+
+    return [fixtures.search_page(chunk, next_page=number < len(chunks) - 1) for number, chunk in enumerate(chunks)]
+
+
+def run(path: str, served_pages: list, search) -> tuple:
+    """
+    Runs a search against a fresh server and client.
+
+    :return: Pages fetched, entries created, results and seconds.
+    """
+
+    server = fixtures.StubServer({path: lambda count: (200, served_pages[min(count, len(served_pages)) - 1])}).start()
+    created = []
+
+    def search_results(*args, **kwargs) -> list:
+        results = extract(*args, **kwargs)
+        created.append(len(results))
+        return results
+
+    extract, _extract.search_results = _extract.search_results, search_results
+    try:
+        with tmdb.TMDbClient(base_url=server.url) as client:
+            start = time.perf_counter()
+            results = search(client)
+            seconds = time.perf_counter() - start
+    finally:
+        _extract.search_results = extract
+        server.stop()
+
+    return len(server.requests), sum(created), len(results), seconds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--movies", type=int, default=60)
+    parser.add_argument("--tv", type=int, default=140)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    mixed, movie_cards = cards(args.movies, args.tv)
+    mixed_pages, movie_pages = pages(mixed), pages(movie_cards)
+    max_pages = max(len(mixed_pages), len(movie_pages))
+
+    def unscoped(client: tmdb.TMDbClient) -> list:
+        return [tmdb_entry for tmdb_entry in client.search(query="benchmark", recursive=True, max_pages=max_pages)
+                if tmdb_entry.is_movie() and tmdb_entry.release_year == YEAR]
+
+    def scoped(client: tmdb.TMDbClient) -> list:
+        return client.search(query="benchmark", recursive=True, max_pages=max_pages, category="movie", year=YEAR)
+
+    for name, path, served_pages, search in [("mixed /search + filter", "/search", mixed_pages, unscoped),
+                                             ("category + year", "/search/movie", movie_pages, scoped)]:
+        measurements = [run(path, served_pages, search) for _ in range(args.runs)]
+        fetched, created, results, _ = measurements[0]
+        median = statistics.median(seconds for *_, seconds in measurements)
+
+        print(f"{name:24} pages {fetched:3}  entries created {created:4}  results {results:3}  "
+              f"median {median * 1000:7.2f} ms ({args.runs} runs)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
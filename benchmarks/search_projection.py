@@ -0,0 +1,73 @@
+"""
+Search projection benchmark for the tmdb package.
+
+Extracts the entries of a parsed search result page with all fields and with the autocomplete projection
+("category", "tmdb_id", "title") and reports the extraction time per page and the memory held by the entries.
+
+Usage: python benchmarks/search_projection.py [--cards 20] [--runs 200]
+"""
+
+import argparse
+import pathlib
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+import tmdb  # noqa: E402
+
+from tmdb import _extract  # noqa: E402
+from tmdb.tests import fixtures  # noqa: E402
+
+PROJECTION = ("category", "tmdb_id", "title")
+
+
+def measure(html_page, fields: tuple, runs: int) -> tuple:
+    """
+    :return: Median extraction time per page in seconds and bytes allocated by the entries of one page.
+    """
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _extract.search_results(html_page, language="en", fields=fields)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    search_results = _extract.search_results(html_page, language="en", fields=fields)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del search_results
+
+    return statistics.median(timings), allocated
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    cards = [fixtures.search_card("movie" if number % 2 else "tv", str(number), f"Title {number}",
+                                  release_date=f"January 1, {1950 + number % 70}", description="An overview. " * 20,
+                                  poster_id=f"poster{number}") for number in range(1, args.cards + 1)]
+    html_page = tmdb.TMDbClient().parse(fixtures.search_page(cards))
+
+    results = {}
+    for name, fields in [("all fields", _extract.SEARCH_FIELDS), ("category, tmdb_id, title", PROJECTION)]:
+        results[name] = measure(html_page, fields, args.runs)
+        seconds, allocated = results[name]
+        print(f"{name:26} median {seconds * 1000:6.3f} ms/page  entries {allocated / 1024:7.1f} KiB "
+              f"({args.cards} cards, {args.runs} runs)")
+
+    (full_seconds, full_allocated), (projected_seconds, projected_allocated) = results.values()
+    print(f"projection: {1 - projected_seconds / full_seconds:.0%} less extraction time, "
+          f"{1 - projected_allocated / full_allocated:.0%} less memory")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,19 @@
 from setuptools import setup, find_packages
 import pathlib
+import re
 
 here = pathlib.Path(__file__).parent.resolve()
 
 # Get the long description from the README file
 long_description = (here / "README.md").read_text(encoding="utf-8")
 
+# Get the version from the package (it is also part of the cache keys)
+version = re.search(r'__version__ = "(.+)"', (here / "tmdb" / "__init__.py").read_text(encoding="utf-8")).group(1)
+
 # Setting up
 setup(
     name="themoviedb-lib",  # Required
-    version="0.0.5",  # Required
+    version=version,  # Required
     description="Library providing useful tools for The Movie Database (TMDb). Not dependent on API-keys.",  # Optional
     long_description=long_description,  # Optional
     long_description_content_type="text/markdown",  # Optional
@@ -28,5 +32,8 @@ setup(
         "tmdb", "themoviedb", "the movie database", "the movie db",
         "movie", "movies", "tv", "tv show", "tv shows"],
     packages=find_packages(),  # Required
-    install_requires=['requests', 'beautifulsoup4', 'fake-useragent']  # Optional
+    install_requires=['requests', 'beautifulsoup4'],  # Optional
+    entry_points={  # Optional
+        "console_scripts": ["tmdb=tmdb.cli:main"],
+    },
 )
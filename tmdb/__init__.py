@@ -1,46 +1,60 @@
+import importlib
 import io
 import re
-import requests
 
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-from functools import cache
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+from . import _data, caching, identity, resilience
+
+if TYPE_CHECKING:
+    import requests
+
+__version__ = "0.0.5"
+
+# heavy dependencies and optional submodules are imported on first access (see __getattr__ below)
+_LAZY_ATTRIBUTES = {
+    "requests": ("requests", None),
+    "BeautifulSoup": ("bs4", "BeautifulSoup"),
+    "Watchlist": (".watchlist", "Watchlist"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name, package=__name__)
+    if attribute is not None:
+        value = getattr(value, attribute)
+
+    # cache the attribute on the module, so later lookups do not go through __getattr__ again
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 
 class Request:
     """ Class providing methods for sending HTTP requests to the website <www.themoviedb.org>. """
 
     @classmethod
-    def get(cls, path: str = "", query: str = "", stream: bool = False) -> requests.Response:
+    def get(cls, path: str = "", query: str = "", stream: bool = False,
+            headers: dict = None) -> "requests.Response":
         """
         Sends an HTTP GET request to TMDb and returns the response.
 
         :param path: URL path.
         :param query: URL query string.
         :param stream: Set this parameter for downloading images.
+        :param headers: Additional request headers (e.g. "If-None-Match" for conditional requests).
         :return: Response.
         """
 
-        # build a TMDb URL
-        url = f"https://www.themoviedb.org{path}?{query}"
-
-        # headers to send with the request
-        headers = {"User-Agent": UserAgent().random}
-
-        # send a GET request using URL and headers
-        response = requests.get(url, headers=headers, stream=stream)
-
-        # if the response status code was between 200 and 400, return the response
-        if response:
-            return response
-
-        # HTTP 404: The requested resource was not found
-        if response.status_code == 404:
-            raise Exception(f"The resource www.themoviedb.org{path} does not exist.")
-
-        # other HTTP status codes
-        raise Exception(f"An error occurred while handling your request to www.themoviedb.org{path}.")
+        return default_client().get(path=path, query=query, stream=stream, headers=headers)
 
     @classmethod
     def image(cls, file_path: str) -> io.BytesIO:
@@ -51,16 +65,13 @@ class Request:
         :return: Image as BytesIO.
         """
 
-        response = Request.get(path=file_path, stream=True)
-
-        return io.BytesIO(response.content)
+        return default_client().image(file_path=file_path)
 
 
 class API:
     """ Class providing methods for sending and processing TMDb API requests. """
 
     @classmethod
-    @cache
     def languages(cls, iso_639: bool = True) -> list:
         """
         Returns a list of languages supported by TMDb.
@@ -69,40 +80,9 @@ class API:
         :return: List of supported languages as IETF language tags.
         """
 
-        # get HTTP response for the TMDb start page
-        response = Request.get()
-
-        # parse response to BeautifulSoup object
-        html_page = BeautifulSoup(response.text, features="html.parser")
-
-        # extract language codes from HTML page
-        languages = []
-        for link_rel in html_page.find_all("link", {"rel": "alternate"}):
-
-            # if string is IETF language tag
-            if re.fullmatch(r"[a-z]{2}-[A-Z]{2}", link_rel.get("hreflang")):
-                language = link_rel.get("hreflang")
-
-                # ISO-639-1 formatted language codes
-                if iso_639:
-                    # remove territory from IETF language tag (e.g. "-DE" or "-AT"
-                    language = re.search(r"[a-z]{2}", language).group()
-
-                    # ignore duplicates (e.g. "de-DE" and "de-AT")
-                    if language in languages:
-                        continue
-
-                    # "cn" (Cantonese) is not included in the ISO-639-1 standard
-                    if language == "cn":
-                        continue
-
-                # add language tag to list
-                languages.append(language)
-
-        return languages
+        return default_client().languages(iso_639=iso_639)
 
     @classmethod
-    @cache
     def categories(cls) -> list:
         """
         Returns a list of categories supported by TMDb.
@@ -110,25 +90,14 @@ class API:
         :return: List of supported categories as strings.
         """
 
-        # get HTTP response for the TMDb search page
-        response = Request.get(path="/search")
-
-        # parse response to BeautifulSoup object
-        html_page = BeautifulSoup(response.text, features="html.parser")
-
-        # extract categories from HTML page
-        categories = []
-        for a_search_tab in html_page.find_all("a", {"class": "search_tab"}):
-            if a_search_tab.get("id") is not None:
-                categories.append(a_search_tab.get("id"))
-
-        return categories
+        return default_client().categories()
 
     @classmethod
     def poster_path(cls, poster_id: str, original_resolution: bool = True,
                     width: int = None, height: int = None) -> str:
         """
         Returns the TMDb URL path for a poster image. Allowed sizes: 94x141, 188x282, 150x225, 300x450, 600x900.
+        Allowed widths (without height): 92, 154, 185, 342, 500, 780.
 
         :param poster_id: The poster ID.
         :param original_resolution: Whether to return the path for the original resolution of the image.
@@ -140,6 +109,13 @@ class API:
         if original_resolution and width is None and height is None:
             return f"/t/p/original/{poster_id}.jpg"
 
+        # variants scaled to a width
+        if height is None:
+            if not any(width == size_width and not cropped for size_width, _, cropped in _data.POSTER_SIZES):
+                raise ValueError("Image size not supported.")
+
+            return f"/t/p/w{width}/{poster_id}.jpg"
+
         if not any([width == 94 and height == 141, width == 188 and height == 282, width == 150 and height == 225,
                     width == 300 and height == 450, width == 600 and height == 900]):
 
@@ -148,65 +124,102 @@ class API:
         return f"/t/p/w{width}_and_h{height}_bestv2/{poster_id}.jpg"
 
     @classmethod
-    def __search_results(cls, html_page: BeautifulSoup, language: str) -> list:
-        search_results = []
-        for div_card in html_page.find_all('div', {'class': 'card v4 tight'}):
-            tmdb_entry = TMDbEntry(language=language)
-
-            div_title = div_card.find('div', {'class': 'title'})
-
-            if div_title.find('a') is not None:
-                tmdb_entry.category = div_title.find('a').get('data-media-type')
+    def poster_size(cls, max_width: int = None, max_height: int = None, preferred: tuple = (),
+                    tolerance: float = 1.25) -> Optional[tuple]:
+        """
+        Returns the smallest poster size supported by TMDb that covers a box of max_width x max_height pixels.
 
-            if div_title.find('a') is not None:
-                tmdb_entry.tmdb_id = re.search(r'(\d+)', div_title.find('a').get('href')).group()
+        A preferred variant (e.g. one of the search card, which the CDN serves often) is returned instead if it covers
+        the box and its area is at most tolerance times the area of the smallest size.
 
-            if div_title.find('h2') is not None:
-                tmdb_entry.title = div_title.find('h2').next_element.strip().replace('amp;', '')
+        :param max_width: Width of the box.
+        :param max_height: Height of the box.
+        :param preferred: Poster variants, e.g. ("w94_and_h141_bestv2", "w188_and_h282_bestv2").
+        :param tolerance: Maximum area of a preferred variant relative to the smallest size.
+        :return: (width, height) for API.poster_path(), height is None for uncropped variants. None if only the
+                 original resolution covers the box.
+        """
 
-            if div_title.find('span', {'class': 'release_date'}) is not None:
-                tmdb_entry.release_year = re.search(r'(\d){4}', div_title
-                                                    .find('span', {'class': 'release_date'}).get_text()).group()
+        preferred_sizes = set()
+        for variant in preferred:
+            match = re.fullmatch(r"w(\d+)(?:_and_h(\d+)_bestv2)?", variant)
+            if match is not None:
+                preferred_sizes.add((int(match.group(1)), None if match.group(2) is None else int(match.group(2))))
 
-            if div_card.find('p') is not None:
-                tmdb_entry.description = div_card.find('p').get_text()
+        candidates = []
+        for width, height, cropped in _data.POSTER_SIZES:
+            if width >= (max_width or 0) and height >= (max_height or 0):
+                candidates.append((width * height, (width, height if cropped else None)))
 
-            if div_card.find('img') is not None:
-                tmdb_entry.poster_id = (re.search(r'(\w)+.jpg', div_card.find('img').get('src')).group()
-                                        .replace(".jpg", ""))
+        if not candidates:
+            return None
 
-            search_results.append(tmdb_entry)
+        candidates.sort()
+        smallest_area = candidates[0][0]
+        for area, size in candidates:
+            if size in preferred_sizes and area <= smallest_area * tolerance:
+                return size
 
-        return search_results
+        return candidates[0][1]
 
     @classmethod
-    @cache
-    def search(cls, query: str = '', page: int = 1, language: str = "en",
-               recursive: bool = False, max_pages: int = 10) -> list:
+    def posters(cls, tmdb_entries: list, max_width: int = None, max_height: int = None, max_workers: int = 8,
+                measure_savings: bool = False) -> tuple:
         """
-        Search for movies or tv series by their original, translated and alternative titles.
+        Downloads the posters for a list of TMDbEntry objects concurrently, each in the smallest size that covers
+        a box of max_width x max_height pixels.
+
+        :param tmdb_entries: List of TMDbEntry objects.
+        :param max_width: Width of the box.
+        :param max_height: Height of the box.
+        :param max_workers: Maximum number of concurrent downloads.
+        :param measure_savings: Request the size of the original images (headers only) to report the bytes saved.
+        :return: Tuple of the list of poster images (None for entries without a poster) and a Counter with the
+                 statistics "posters", "bytes" and, with measure_savings, "bytes_original" and "bytes_saved".
         """
 
-        # build a search request for TMDb
-        path = f'/search'
-        query = f"language={language}&page={page}&query={query}"
+        return default_client().posters(tmdb_entries, max_width=max_width, max_height=max_height,
+                                        max_workers=max_workers, measure_savings=measure_savings)
 
-        # get response from TMDb request
-        response = Request.get(path=path, query=query)
+    @classmethod
+    def search(cls, query: str = '', page: int = 1, language: str = "en", recursive: bool = False,
+               max_pages: int = 10, prefetch: tuple = (), prefetch_budget: int = 20, category: str = None,
+               year: int = None, fields: tuple = None) -> list:
+        """
+        Search for movies or tv series by their original, translated and alternative titles.
 
-        # parse response to BeautifulSoup object
-        html_page = BeautifulSoup(response.text, features='html.parser')
+        Results can be restricted to a category ("movie" or "tv") and a release year, their attributes to the given
+        fields, and their follow-up data can be fetched into the cache in the background (see TMDbClient.search()).
+        """
 
-        # get search results from html page
-        search_results = cls.__search_results(html_page, language=language)
+        return default_client().search(query=query, page=page, language=language, recursive=recursive,
+                                       max_pages=max_pages, prefetch=prefetch, prefetch_budget=prefetch_budget,
+                                       category=category, year=year, fields=fields)
 
-        # if recursive is set, call search for every page after the current
-        if recursive and max_pages > 1:
-            if html_page.find('span', {'class': 'page next'}):
-                search_results += cls.search(query=query, page=page + 1, language=language,
-                                             recursive=True, max_pages=max_pages - 1)
+    @classmethod
+    def search_multilang(cls, query: str = '', languages: list = ("en",), page: int = 1,
+                         recursive: bool = False, max_pages: int = 10, max_workers: int = None, category: str = None,
+                         year: int = None, fields: tuple = None) -> list:
+        """
+        Search for movies or tv series in several languages at once. The search result pages for all languages are
+        fetched concurrently and merged into one record per (category, tmdb_id).
+
+        :param query: Search query.
+        :param languages: ISO-639-1 language codes to search in.
+        :param page: Search result page.
+        :param recursive: Search the following result pages as well.
+        :param max_pages: Maximum number of result pages per language.
+        :param max_workers: Maximum number of concurrent requests (default: one per language).
+        :param category: Search only "movie" or "tv".
+        :param year: Release year.
+        :param fields: Attributes to extract in addition to category and tmdb_id (default: all, see
+                       TMDbClient.search()).
+        :return: List of dictionaries with localized titles, descriptions and poster ids keyed by language.
+        """
 
-        return search_results
+        return default_client().search_multilang(query=query, languages=languages, page=page, recursive=recursive,
+                                                 max_pages=max_pages, max_workers=max_workers, category=category,
+                                                 year=year, fields=fields)
 
     class Movie:
         @classmethod
@@ -243,65 +256,24 @@ class API:
             raise NotImplementedError()
 
         @classmethod
-        @cache
         def seasons(cls, series_id: str) -> list:
-            # build a request for TMDb
-            path = f"/tv/{series_id}/seasons"
-
-            # get response from TMDb request
-            response = Request.get(path=path)
-
-            # parse response to BeautifulSoup object
-            html_page = BeautifulSoup(response.text, features="html.parser")
-
-            # extract seasons from HTML page
-            seasons = []
-            for season in html_page.find_all("div", {"class": "season_wrapper"}):
-                season_number = (re.search(r"season/(\d+)", season.find("h2").find("a").get("href")).group()
-                                 .replace("season/", ""))
-                seasons.append(season_number)
-
-            return seasons
+            return default_client().seasons(series_id=series_id)
 
         @classmethod
         def number_of_seasons(cls, series_id: str) -> int:
-            # get seasons for the tv show
-            seasons = API.TV.seasons(series_id=series_id)
-
-            # remove season '0'
-            if "0" in seasons:
-                seasons.remove("0")
-
-            # return season count
-            return len(seasons)
+            return default_client().number_of_seasons(series_id=series_id)
 
         @classmethod
-        @cache
         def episodes(cls, series_id: str, season_id: str, language: str = "en") -> list:
-            # build a request for TMDb
-            path = f"/tv/{series_id}/season/{season_id}"
-            query = f"language={language}"
-
-            # get response from TMDb request
-            response = Request.get(path=path, query=query)
-
-            # parse response to BeautifulSoup object
-            html_page = BeautifulSoup(response.text, features="html.parser")
-
-            # extract episodes from HTML page
-            episodes = []
-            for div_card in html_page.find_all("div", {"class": "card"}):
-                episode_number = div_card.find("span", {'class': "episode_number"}).get_text()
-                episode_title = (div_card.find("div", {"class": "episode_title"}).find("a").get_text()
-                                 .replace("amp;", ""))
-                episodes.append({"number": episode_number, "title": episode_title})
-
-            return episodes
+            return default_client().episodes(series_id=series_id, season_id=season_id, language=language)
 
 
 class TMDbEntry:
+    # client sending the follow-up requests of the entry (set by TMDbClient.search, default client if None)
+    _client = None
+
     def __init__(self, category: str = None, tmdb_id: str = None, title: str = None, release_year: str = None,
-                 description: str = None, poster_id: str = None, language: str = "en"):
+                 description: str = None, poster_id: str = None, language: str = "en", poster_variants: tuple = ()):
         self.category = category
         self.tmdb_id = tmdb_id
         self.title = title
@@ -309,6 +281,24 @@ class TMDbEntry:
         self.description = description
         self.poster_id = poster_id
         self.language = language
+        self.poster_variants = poster_variants
+
+    @classmethod
+    def _unchecked(cls, category: str = None, tmdb_id: str = None, title: str = None, release_year: str = None,
+                   description: str = None, poster_id: str = None, language: str = "en",
+                   poster_variants: tuple = ()) -> "TMDbEntry":
+        # builds an entry from trusted values (cache, export files) without the validating setters
+        tmdb_entry = cls.__new__(cls)
+        tmdb_entry._category = category
+        tmdb_entry._tmdb_id = tmdb_id
+        tmdb_entry._title = title
+        tmdb_entry._release_year = release_year
+        tmdb_entry._description = description
+        tmdb_entry._poster_id = poster_id
+        tmdb_entry._language = language
+        tmdb_entry._poster_variants = poster_variants
+
+        return tmdb_entry
 
     def __str__(self):
         if self.title is None:
@@ -319,9 +309,16 @@ class TMDbEntry:
         return f'{self.title} ({self.release_year})'
 
     def __eq__(self, other: "TMDbEntry") -> bool:
+        if not isinstance(other, TMDbEntry):
+            return NotImplemented
+
         return (self.category == other.category
                 and self.tmdb_id == other.tmdb_id)
 
+    def __hash__(self) -> int:
+        # consistent with __eq__, entries must not change category or tmdb_id while in a set or dictionary
+        return hash((self.category, self.tmdb_id))
+
     @property
     def category(self) -> Optional[str]:
         return self._category
@@ -332,7 +329,7 @@ class TMDbEntry:
             if not isinstance(category, str):
                 raise TypeError("TMDbEntry category must be a string.")
 
-            if category not in API.categories():
+            if category not in _data.CATEGORIES:
                 raise ValueError("TMDbEntry category must be 'movie' or 'tv'.")
 
         self._category = category
@@ -406,6 +403,17 @@ class TMDbEntry:
 
         self._poster_id = poster_id
 
+    @property
+    def poster_variants(self) -> tuple:
+        return self._poster_variants
+
+    @poster_variants.setter
+    def poster_variants(self, poster_variants: tuple = ()) -> None:
+        if not isinstance(poster_variants, tuple) or not all(isinstance(variant, str) for variant in poster_variants):
+            raise TypeError("TMDbEntry poster_variants must be a tuple of strings.")
+
+        self._poster_variants = poster_variants
+
     @property
     def language(self) -> Optional[str]:
         return self._language
@@ -416,11 +424,17 @@ class TMDbEntry:
             if not isinstance(language, str):
                 raise TypeError("TMDbEntry language must be a string.")
 
-            if language not in API.languages():
-                raise ValueError(f"TMDbEntry language must be one of the following: {API.languages()}.")
+            if language not in _data.LANGUAGES:
+                raise ValueError(f"TMDbEntry language must be one of the following: {list(_data.LANGUAGES)}.")
 
         self._language = language
 
+    @property
+    def client(self) -> "TMDbClient":
+        """ The client sending the follow-up requests (posters, seasons, episodes) of this entry. """
+
+        return default_client() if self._client is None else self._client
+
     def format_plex(self) -> str:
         """
         Formats a file name according to the Plex scheme.\n
@@ -457,30 +471,40 @@ class TMDbEntry:
 
         return self.category == "tv"
 
-    def poster(self, resolution: str = "original", high_resolution: bool = False) -> Optional[io.BytesIO]:
+    def poster(self, resolution: str = "original", high_resolution: bool = False,
+               max_width: int = None, max_height: int = None) -> Optional[io.BytesIO]:
         """
         Returns the poster of this TMDbEntry. By default, with a resolution of 94x141.
 
         :param resolution: Specify the desired resolution for the image (e.g. 'original', 'low', 'medium' or 'high').
         :parameter high_resolution: Specify whether the image should be returned in a higher resolution (600x900).
+        :param max_width: Return the smallest poster at least this wide (overrides resolution).
+        :param max_height: Return the smallest poster at least this high (overrides resolution).
         :return: Poster image.
         """
 
         if self.poster_id is None:
             return None
 
+        if max_width is not None or max_height is not None:
+            return self.client.poster(poster_id=self.poster_id, max_width=max_width, max_height=max_height,
+                                      preferred=self.poster_variants)
+
         if high_resolution:
             resolution = "high"
 
+        return self.client.image(file_path=self._poster_path(resolution))
+
+    def _poster_path(self, resolution: str) -> str:
         match resolution:
             case "original":
-                return Request.image(file_path=API.poster_path(poster_id=self.poster_id, original_resolution=True))
+                return API.poster_path(poster_id=self.poster_id, original_resolution=True)
             case "low":
-                return Request.image(file_path=API.poster_path(poster_id=self.poster_id, width=150, height=225))
+                return API.poster_path(poster_id=self.poster_id, width=150, height=225)
             case "medium":
-                return Request.image(file_path=API.poster_path(poster_id=self.poster_id, width=300, height=450))
+                return API.poster_path(poster_id=self.poster_id, width=300, height=450)
             case "high":
-                return Request.image(file_path=API.poster_path(poster_id=self.poster_id, width=600, height=900))
+                return API.poster_path(poster_id=self.poster_id, width=600, height=900)
             case _:
                 raise ValueError("Specified resolution must be 'low', 'medium', 'high' or 'original'.")
 
@@ -495,7 +519,7 @@ class TMDbEntry:
         if not self.is_tv():
             raise Exception(f"TMDbEntry is not a TV series. Category: {self.category}")
 
-        return API.TV.seasons(series_id=self.tmdb_id)
+        return self.client.seasons(series_id=self.tmdb_id)
 
     def episodes(self, season_id: str) -> dict:
         """
@@ -509,4 +533,8 @@ class TMDbEntry:
         if not self.is_tv():
             raise Exception(f"TMDbEntry is not a TV series. Category: {self.category}")
 
-        return API.TV.episodes(series_id=self.tmdb_id, season_id=season_id, language=self.language)
+        return self.client.episodes(series_id=self.tmdb_id, season_id=season_id, language=self.language)
+
+
+# the client module depends on the classes above
+from .client import TMDbClient, default_client, set_default_client  # noqa: E402
@@ -0,0 +1,45 @@
+"""
+Static lookup tables used by the library.
+
+The tables are plain tuples so that they are available at import time without any network access or disk parsing.
+"""
+
+# browser user agents sent with requests to TMDb (a random one is picked for every request)
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    "Version/17.4.1 Safari/605.1.15",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+)
+
+# IETF language tags offered by TMDb (<link rel="alternate" hreflang="..."> on the start page)
+LANGUAGES_IETF = (
+    "ar-AE", "ar-SA", "be-BY", "bg-BG", "bn-BD", "ca-ES", "ch-GU", "cn-CN", "cs-CZ", "cy-GB", "da-DK", "de-AT",
+    "de-CH", "de-DE", "el-GR", "en-AU", "en-CA", "en-GB", "en-IE", "en-NZ", "en-US", "eo-EO", "es-ES", "es-MX",
+    "et-EE", "eu-ES", "fa-IR", "fi-FI", "fr-CA", "fr-FR", "ga-IE", "gd-GB", "gl-ES", "he-IL", "hi-IN", "hr-HR",
+    "hu-HU", "id-ID", "it-IT", "ja-JP", "ka-GE", "kk-KZ", "kn-IN", "ko-KR", "ky-KG", "lt-LT", "lv-LV", "ml-IN",
+    "mr-IN", "ms-MY", "ms-SG", "nb-NO", "nl-BE", "nl-NL", "no-NO", "pa-IN", "pl-PL", "pt-BR", "pt-PT", "ro-RO",
+    "ru-RU", "si-LK", "sk-SK", "sl-SI", "sq-AL", "sr-RS", "sv-SE", "ta-IN", "te-IN", "th-TH", "tl-PH", "tr-TR",
+    "uk-UA", "vi-VN", "zh-CN", "zh-HK", "zh-SG", "zh-TW", "zu-ZA",
+)
+
+# ISO-639-1 language codes derived from the IETF language tags ("cn" is not part of the ISO-639-1 standard)
+LANGUAGES = tuple(dict.fromkeys(tag[:2] for tag in LANGUAGES_IETF if not tag.startswith("cn")))
+
+# categories offered by the TMDb search page (<a class="search_tab" id="...">)
+CATEGORIES = ("movie", "tv", "person", "collection", "company", "keyword", "network")
+
+# poster variants served by TMDb as (width, height, cropped), ordered by size. Cropped variants have the path
+# "/t/p/w{width}_and_h{height}_bestv2/", the others "/t/p/w{width}/" (height assuming the usual 2:3 aspect ratio)
+POSTER_SIZES = (
+    (92, 138, False), (94, 141, True), (150, 225, True), (154, 231, False), (185, 278, False), (188, 282, True),
+    (300, 450, True), (342, 513, False), (500, 750, False), (600, 900, True), (780, 1170, False),
+)
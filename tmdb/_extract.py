@@ -0,0 +1,169 @@
+"""
+Extraction of data from parsed TMDb pages. The functions only read the BeautifulSoup tree and send no requests.
+"""
+
+import re
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+def languages(html_page: "BeautifulSoup", iso_639: bool = True) -> list:
+    # extract language codes from HTML page
+    language_tags = []
+    for link_rel in html_page.find_all("link", {"rel": "alternate"}):
+
+        # if string is IETF language tag
+        if re.fullmatch(r"[a-z]{2}-[A-Z]{2}", link_rel.get("hreflang")):
+            language = link_rel.get("hreflang")
+
+            # ISO-639-1 formatted language codes
+            if iso_639:
+                # remove territory from IETF language tag (e.g. "-DE" or "-AT"
+                language = re.search(r"[a-z]{2}", language).group()
+
+                # ignore duplicates (e.g. "de-DE" and "de-AT")
+                if language in language_tags:
+                    continue
+
+                # "cn" (Cantonese) is not included in the ISO-639-1 standard
+                if language == "cn":
+                    continue
+
+            # add language tag to list
+            language_tags.append(language)
+
+    return language_tags
+
+
+def categories(html_page: "BeautifulSoup") -> list:
+    # extract categories from HTML page
+    search_categories = []
+    for a_search_tab in html_page.find_all("a", {"class": "search_tab"}):
+        if a_search_tab.get("id") is not None:
+            search_categories.append(a_search_tab.get("id"))
+
+    return search_categories
+
+
+# fields of search results that can be extracted from the result cards
+SEARCH_FIELDS = ("category", "tmdb_id", "title", "release_year", "description", "poster_id", "poster_variants")
+
+
+def search_results(html_page: "BeautifulSoup", language: str, category: str = None, year: str = None,
+                   fields: tuple = SEARCH_FIELDS) -> list:
+    from . import TMDbEntry
+
+    results = []
+    for div_card in html_page.find_all('div', {'class': 'card v4 tight'}):
+        div_title = div_card.find('div', {'class': 'title'})
+        a_title = div_title.find('a')
+
+        # filter the cards before building entries (category pages only contain their category)
+        card_category = category if a_title is None else a_title.get('data-media-type', category)
+        if category is not None and card_category != category:
+            continue
+
+        release_year = None
+        if year is not None or "release_year" in fields:
+            span_release_date = div_title.find('span', {'class': 'release_date'})
+            if span_release_date is not None:
+                release_year = re.search(r'(\d){4}', span_release_date.get_text()).group()
+
+            if year is not None and release_year != year:
+                continue
+
+        # only the requested fields are extracted, the others are left empty
+        tmdb_entry = TMDbEntry(language=language)
+
+        if "category" in fields:
+            tmdb_entry.category = card_category
+
+        if "tmdb_id" in fields and a_title is not None:
+            tmdb_entry.tmdb_id = re.search(r'(\d+)', a_title.get('href')).group()
+
+        if "title" in fields and div_title.find('h2') is not None:
+            tmdb_entry.title = div_title.find('h2').next_element.strip().replace('amp;', '')
+
+        if "release_year" in fields:
+            tmdb_entry.release_year = release_year
+
+        if "description" in fields and div_card.find('p') is not None:
+            tmdb_entry.description = div_card.find('p').get_text()
+
+        if ("poster_id" in fields or "poster_variants" in fields) and div_card.find('img') is not None:
+            img = div_card.find('img')
+
+            if "poster_id" in fields:
+                tmdb_entry.poster_id = (re.search(r'(\w)+.jpg', img.get('src')).group()
+                                        .replace(".jpg", ""))
+
+            # keep the image variants the card already links to (src and srcset)
+            if "poster_variants" in fields:
+                tmdb_entry.poster_variants = tuple(dict.fromkeys(
+                    re.findall(r'/t/p/(\w+)/', f"{img.get('src')} {img.get('srcset', '')}")))
+
+        results.append(tmdb_entry)
+
+    return results
+
+
+def listing(html_page: "BeautifulSoup", language: str) -> list:
+    from . import TMDbEntry
+
+    # cards of the popular and trending listings (e.g. "/movie", "/tv")
+    results = []
+    for div_card in html_page.find_all('div', {'class': 'card style_1'}):
+        a_title = div_card.find('h2').find('a') if div_card.find('h2') is not None else None
+        if a_title is None:
+            continue
+
+        match = re.search(r'/(movie|tv)/(\d+)', a_title.get('href'))
+        if match is None:
+            continue
+
+        tmdb_entry = TMDbEntry(category=match.group(1), tmdb_id=match.group(2), language=language)
+        tmdb_entry.title = a_title.get_text().strip()
+
+        if div_card.find('p') is not None:
+            release_year = re.search(r'\d{4}', div_card.find('p').get_text())
+            if release_year is not None:
+                tmdb_entry.release_year = release_year.group()
+
+        if div_card.find('img') is not None:
+            poster_id = re.search(r'(\w+)\.jpg', div_card.find('img').get('src', ''))
+            if poster_id is not None:
+                tmdb_entry.poster_id = poster_id.group(1)
+
+        results.append(tmdb_entry)
+
+    return results
+
+
+def has_next_page(html_page: "BeautifulSoup") -> bool:
+    return html_page.find('span', {'class': 'page next'}) is not None
+
+
+def seasons(html_page: "BeautifulSoup") -> list:
+    # extract seasons from HTML page
+    season_numbers = []
+    for season in html_page.find_all("div", {"class": "season_wrapper"}):
+        season_number = (re.search(r"season/(\d+)", season.find("h2").find("a").get("href")).group()
+                         .replace("season/", ""))
+        season_numbers.append(season_number)
+
+    return season_numbers
+
+
+def episodes(html_page: "BeautifulSoup") -> list:
+    # extract episodes from HTML page
+    season_episodes = []
+    for div_card in html_page.find_all("div", {"class": "card"}):
+        episode_number = div_card.find("span", {'class': "episode_number"}).get_text()
+        episode_title = (div_card.find("div", {"class": "episode_title"}).find("a").get_text()
+                         .replace("amp;", ""))
+        season_episodes.append({"number": episode_number, "title": episode_title})
+
+    return season_episodes
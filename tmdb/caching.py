@@ -0,0 +1,569 @@
+"""
+Pluggable cache backends for the results of API.search(), API.TV.seasons() and API.TV.episodes().
+
+Cached values are stored as compact serialized bytes (JSON, zlib-compressed above a size threshold) under keys that are
+namespaced by the library version, so several processes or hosts can share one cache:
+
+    import tmdb
+
+    # cache of the default client used by API and TMDbEntry
+    tmdb.caching.set_backend(tmdb.caching.RedisCache(host="cache.internal"))
+
+    # cache of a separate client
+    client = tmdb.TMDbClient(cache=tmdb.caching.DiskCache("/var/cache/tmdb"))
+"""
+
+import functools
+import os
+import re
+import struct
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Optional, Union
+
+from .resilience import CircuitOpenError
+
+# serialized values above this size (in bytes) are compressed
+COMPRESSION_THRESHOLD = 512
+
+
+class CacheBackend:
+    """ Interface for cache backends. Keys are strings, values are bytes. """
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the value stored for a key.
+
+        :param key: Cache key.
+        :return: Value or None if the key is not cached (or expired).
+        """
+
+        raise NotImplementedError()
+
+    def exists(self, key: str) -> bool:
+        """
+        Returns whether a key is cached, without transferring its value (if the backend supports that).
+
+        :param key: Cache key.
+        :return: True if the key is cached (and not expired).
+        """
+
+        return self.get(key) is not None
+
+    def set(self, key: str, value: bytes, ttl: float = None) -> None:
+        """
+        Stores a value for a key.
+
+        :param key: Cache key.
+        :param value: Value.
+        :param ttl: Time to live in seconds (default: no expiry).
+        """
+
+        raise NotImplementedError()
+
+    def delete(self, key: str) -> None:
+        """
+        Removes a key from the cache.
+
+        :param key: Cache key.
+        """
+
+        raise NotImplementedError()
+
+    def clear(self) -> None:
+        """ Removes all keys from the cache. """
+
+        raise NotImplementedError()
+
+
+class MemoryCache(CacheBackend):
+    """ Thread-safe in-process cache with optional LRU eviction. """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def exists(self, key: str) -> bool:
+        # does not count as a use for the LRU eviction
+        with self._lock:
+            entry = self._entries.get(key)
+
+        return entry is not None and (entry[0] is None or entry[0] >= time.monotonic())
+
+    def set(self, key: str, value: bytes, ttl: float = None) -> None:
+        expires = None if ttl is None else time.monotonic() + ttl
+
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+
+            # evict the least recently used entries
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache(CacheBackend):
+    """ Cache storing one file per key in a directory. Can be shared by processes on the same host. """
+
+    # file header: expiry as UNIX timestamp (0 for no expiry)
+    _HEADER = struct.Struct(">d")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        import hashlib
+
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        (expires,) = self._HEADER.unpack_from(data)
+        if expires and expires < time.time():
+            self.delete(key)
+            return None
+
+        return data[self._HEADER.size:]
+
+    def exists(self, key: str) -> bool:
+        # only the header with the expiry is read
+        try:
+            with open(self._path(key), "rb") as file:
+                (expires,) = self._HEADER.unpack(file.read(self._HEADER.size))
+        except (OSError, struct.error):
+            return False
+
+        return not expires or expires >= time.time()
+
+    def set(self, key: str, value: bytes, ttl: float = None) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write to a unique temporary file first, so readers never see partially written values
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(self._HEADER.pack(0 if ttl is None else time.time() + ttl) + value)
+
+        os.replace(temporary_path, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        # only the files of the cache are removed, the directory may be shared with other files
+        for prefix in os.listdir(self.directory):
+            subdirectory = os.path.join(self.directory, prefix)
+            if not re.fullmatch(r"[0-9a-f]{2}", prefix) or not os.path.isdir(subdirectory):
+                continue
+
+            for name in os.listdir(subdirectory):
+                if name.startswith(prefix) and re.fullmatch(r"[0-9a-f]{40}(\.\d+\.\d+\.tmp)?", name):
+                    try:
+                        os.remove(os.path.join(subdirectory, name))
+                    except FileNotFoundError:
+                        pass
+
+            try:
+                os.rmdir(subdirectory)
+            except OSError:
+                # the subdirectory contains other files
+                pass
+
+
+class _SocketCache(CacheBackend):
+    """
+    Base class for network caches. One connection is shared by all threads. Network errors are treated as cache
+    misses, so an unavailable cache server slows requests down but never makes them fail.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._socket = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        import socket
+
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._file = self._socket.makefile("rb")
+
+    def _disconnect(self) -> None:
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+
+        self._socket = None
+        self._file = None
+
+    def _call(self, function, *args):
+        with self._lock:
+            try:
+                if self._socket is None:
+                    self._connect()
+
+                return function(*args)
+            except (OSError, ValueError):
+                self._disconnect()
+                return None
+
+    def _readline(self) -> bytes:
+        line = self._file.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection to the cache server was closed.")
+
+        return line[:-2]
+
+    def _read(self, size: int) -> bytes:
+        data = self._file.read(size + 2)
+        if len(data) != size + 2:
+            raise ConnectionError("Connection to the cache server was closed.")
+
+        return data[:-2]
+
+    def close(self) -> None:
+        """ Closes the connection to the cache server. """
+
+        with self._lock:
+            self._disconnect()
+
+
+class MemcachedCache(_SocketCache):
+    """ Cache using a server speaking the memcached text protocol. """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 11211, timeout: float = 1.0):
+        super().__init__(host=host, port=port, timeout=timeout)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call(self._get, key)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        self._socket.sendall(f"get {key}\r\n".encode("utf-8"))
+
+        value = None
+        line = self._readline()
+        if line.startswith(b"VALUE "):
+            value = self._read(int(line.split()[3]))
+            line = self._readline()
+
+        if line != b"END":
+            raise ValueError(f"Unexpected memcached response: {line!r}")
+
+        return value
+
+    def exists(self, key: str) -> bool:
+        return bool(self._call(self._exists, key))
+
+    def _exists(self, key: str) -> bool:
+        # meta get without flags returns no value (memcached 1.6 and later)
+        self._socket.sendall(f"mg {key}\r\n".encode("utf-8"))
+
+        line = self._readline()
+        if line == b"ERROR":
+            return self._get(key) is not None
+        if line not in (b"HD", b"EN"):
+            raise ValueError(f"Unexpected memcached response: {line!r}")
+
+        return line == b"HD"
+
+    def set(self, key: str, value: bytes, ttl: float = None) -> None:
+        self._call(self._set, key, value, ttl)
+
+    def _set(self, key: str, value: bytes, ttl: float = None) -> None:
+        expires = 0 if ttl is None else max(1, int(ttl))
+        self._socket.sendall(f"set {key} 0 {expires} {len(value)}\r\n".encode("utf-8") + value + b"\r\n")
+        self._readline()
+
+    def delete(self, key: str) -> None:
+        self._call(self._delete, key)
+
+    def _delete(self, key: str) -> None:
+        self._socket.sendall(f"delete {key}\r\n".encode("utf-8"))
+        self._readline()
+
+    def clear(self) -> None:
+        """ Not supported: memcached cannot list the keys of this library, and flush_all would remove other keys. """
+
+        raise NotImplementedError("MemcachedCache cannot be cleared without removing the keys of other applications "
+                                  "on the server.")
+
+
+class RedisCache(_SocketCache):
+    """ Cache using a server speaking the Redis protocol (RESP). """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, timeout: float = 1.0):
+        super().__init__(host=host, port=port, timeout=timeout)
+
+    def _command(self, *arguments) -> Union[bytes, list, None]:
+        arguments = [argument if isinstance(argument, bytes) else str(argument).encode("utf-8")
+                     for argument in arguments]
+
+        request = [f"*{len(arguments)}\r\n".encode("utf-8")]
+        for argument in arguments:
+            request += [f"${len(argument)}\r\n".encode("utf-8"), argument, b"\r\n"]
+        self._socket.sendall(b"".join(request))
+
+        return self._reply()
+
+    def _reply(self) -> Union[bytes, list, None]:
+        line = self._readline()
+        match line[:1]:
+            case b"+" | b":":
+                return line[1:]
+            case b"$":
+                size = int(line[1:])
+                return None if size < 0 else self._read(size)
+            case b"*":
+                size = int(line[1:])
+                return None if size < 0 else [self._reply() for _ in range(size)]
+            case _:
+                raise ValueError(f"Unexpected Redis response: {line!r}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call(self._command, "GET", key)
+
+    def exists(self, key: str) -> bool:
+        return self._call(self._command, "EXISTS", key) == b"1"
+
+    def set(self, key: str, value: bytes, ttl: float = None) -> None:
+        if ttl is None:
+            self._call(self._command, "SET", key, value)
+        else:
+            self._call(self._command, "SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self._call(self._command, "DEL", key)
+
+    def clear(self) -> None:
+        """ Removes the keys of this library ("tmdb:*") from the cache server, other keys are kept. """
+
+        self._call(self._clear)
+
+    def _clear(self) -> None:
+        cursor = b"0"
+        while True:
+            cursor, keys = self._command("SCAN", cursor, "MATCH", "tmdb:*", "COUNT", 1000)
+            if keys:
+                self._command("DEL", *keys)
+
+            if cursor == b"0":
+                break
+
+
+def set_backend(backend: CacheBackend, ttl: float = None) -> None:
+    """
+    Sets the cache backend of the default client (see tmdb.default_client()).
+
+    :param backend: Cache backend.
+    :param ttl: Time to live of cached values in seconds (default: no expiry).
+    """
+
+    from .client import default_client
+
+    if not isinstance(backend, CacheBackend):
+        raise TypeError("Cache backend must be a CacheBackend.")
+
+    client = default_client()
+    client.cache = backend
+    client.cache_ttl = ttl
+
+
+def get_backend() -> CacheBackend:
+    """
+    Returns the cache backend of the default client.
+
+    :return: Cache backend.
+    """
+
+    from .client import default_client
+
+    return default_client().cache
+
+
+def dumps(value) -> bytes:
+    """
+    Serializes a cached value (lists, dictionaries, strings, numbers and TMDbEntry objects).
+
+    :param value: Value.
+    :return: Serialized value.
+    """
+
+    import json
+
+    data = json.dumps(value, default=_encode, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    if len(data) > COMPRESSION_THRESHOLD:
+        import zlib
+
+        return b"z" + zlib.compress(data)
+
+    return b"j" + data
+
+
+def loads(data: bytes):
+    """
+    Deserializes a value created by dumps().
+
+    :param data: Serialized value.
+    :return: Value.
+    """
+
+    import json
+
+    if data[:1] == b"z":
+        import zlib
+
+        return json.loads(zlib.decompress(data[1:]), object_hook=_decode)
+
+    return json.loads(data[1:], object_hook=_decode)
+
+
+_ENTRY_FIELDS = ("category", "tmdb_id", "title", "release_year", "description", "poster_id", "language",
+                 "poster_variants")
+
+
+def _encode(value) -> dict:
+    from . import TMDbEntry
+
+    if isinstance(value, TMDbEntry):
+        return {"__tmdb_entry__": [getattr(value, field) for field in _ENTRY_FIELDS]}
+
+    raise TypeError(f"Object of type {type(value).__name__} can not be cached.")
+
+
+def _decode(value: dict):
+    if "__tmdb_entry__" not in value:
+        return value
+
+    from . import TMDbEntry
+
+    fields = dict(zip(_ENTRY_FIELDS, value["__tmdb_entry__"]))
+
+    # JSON has no tuples
+    fields["poster_variants"] = tuple(fields["poster_variants"])
+
+    # the values were validated before they were cached, so the setters are bypassed
+    return TMDbEntry._unchecked(**fields)
+
+
+def cached(name: str, ttl: float = None):
+    """
+    Decorator caching the results of a TMDbClient method in the cache backend of the client. Keys have the form
+    "tmdb:<version>:<name>:<hash of the arguments>".
+
+    With a ttl, a stale copy of every value is kept without expiry and returned while the circuit breaker of the
+    endpoint is open (see tmdb.resilience). Hits, misses and stale values returned are counted in the cache_statistics
+    of the client.
+
+    :param name: Name of the cached function used in the cache keys.
+    :param ttl: Time to live of the cached values in seconds (default: the cache_ttl of the client).
+    """
+
+    def decorator(function):
+        # parameter names (without self) and default values of the cached function
+        parameters = function.__code__.co_varnames[1:function.__code__.co_argcount]
+        defaults = dict(zip(parameters[len(parameters) - len(function.__defaults__ or ()):],
+                            function.__defaults__ or ()))
+
+        def cache_key(*args, **kwargs) -> str:
+            # normalize positional and keyword arguments, so equal calls share a key
+            arguments = {**defaults, **dict(zip(parameters, args)), **kwargs}
+            return make_key(name, [arguments.get(parameter) for parameter in parameters])
+
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            key = cache_key(*args, **kwargs)
+
+            backend = self.cache
+            data = backend.get(key)
+            if data is not None:
+                self._count_cache("hits")
+                return loads(data)
+
+            self._count_cache("misses")
+            value_ttl = self.cache_ttl if ttl is None else ttl
+
+            try:
+                result = function(self, *args, **kwargs)
+            except CircuitOpenError:
+                stale = None if value_ttl is None else backend.get(f"{key}:stale")
+                if stale is None:
+                    raise
+
+                self._count_cache("stale")
+                return loads(stale)
+
+            data = dumps(result)
+            backend.set(key, data, ttl=value_ttl)
+            if value_ttl is not None:
+                backend.set(f"{key}:stale", data)
+
+            return result
+
+        # key of a call without self, e.g. TMDbClient.seasons.cache_key(series_id="1399")
+        wrapper.cache_key = cache_key
+
+        return wrapper
+
+    return decorator
+
+
+def make_key(name: str, arguments) -> str:
+    """
+    Builds a cache key namespaced by the library version.
+
+    :param name: Name of the cached function.
+    :param arguments: Arguments of the call.
+    :return: Cache key.
+    """
+
+    import hashlib
+
+    from . import __version__
+
+    digest = hashlib.sha1(repr(arguments).encode("utf-8")).hexdigest()
+
+    return f"tmdb:{__version__}:{name}:{digest}"
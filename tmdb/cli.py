@@ -0,0 +1,250 @@
+"""
+Command-line batch tool. Reads one job per line from stdin (JSON objects or plain values) and writes one JSON line per
+job to stdout as the results complete. Input is read as a stream and at most a small window of jobs is in flight, so
+memory use does not grow with the input:
+
+    $ printf 'Breaking Bad\\nThe Wire\\n' | tmdb search --language en
+    $ tmdb seasons < series_ids.txt
+    $ echo '{"series_id": "1396", "season_id": "1"}' | tmdb episodes
+    $ tmdb posters --output-dir posters --max-width 200 < poster_ids.txt
+
+Plain input lines are the query (search), the series id (seasons), "<series id> <season id>" (episodes) or the poster
+id (posters). Failed jobs are written with an "error" key and make the exit status 1.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from collections import deque
+from typing import Callable, Iterable, Iterator, TextIO
+
+from . import TMDbClient, caching
+
+_ENTRY_FIELDS = ("category", "tmdb_id", "title", "release_year", "description", "poster_id", "language")
+
+
+def parse_line(line: str, plain_keys: tuple) -> dict:
+    """
+    Parses an input line to a job.
+
+    :param line: JSON object or whitespace-separated plain values.
+    :param plain_keys: Keys of the plain values (the last key takes the rest of the line).
+    :return: Job as dictionary.
+    """
+
+    line = line.strip()
+
+    if line.startswith("{"):
+        job = json.loads(line)
+        if not isinstance(job, dict):
+            raise ValueError("Input line must be a JSON object or plain text.")
+
+        return job
+
+    values = line.split(maxsplit=len(plain_keys) - 1)
+    if len(values) != len(plain_keys):
+        raise ValueError(f"Input line must contain {' '.join(f'<{key}>' for key in plain_keys)}.")
+
+    return dict(zip(plain_keys, values))
+
+
+def stream(function: Callable, jobs: Iterable, workers: int = 8, ordered: bool = True,
+           on_wait: Callable = None) -> Iterator[tuple]:
+    """
+    Applies a function to jobs concurrently and yields (job, result, error) tuples as they complete. At most
+    2 * workers jobs are read ahead.
+
+    :param function: Function called with a job.
+    :param jobs: Iterable of jobs (read lazily).
+    :param workers: Number of threads.
+    :param ordered: Yield the results in input order (otherwise in completion order).
+    :param on_wait: Function called before blocking on a running job (e.g. to flush the output).
+    :return: Iterator of (job, result, error) tuples.
+    """
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    def outcome(job, future) -> tuple:
+        error = future.exception()
+        return job, None if error is not None else future.result(), error
+
+    jobs = iter(jobs)
+    window = 2 * workers
+    exhausted = False
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tmdb-cli") as executor:
+        # running jobs in input order (ordered) or by future (unordered)
+        pending = deque() if ordered else {}
+
+        while True:
+            # fill the window
+            while not exhausted and len(pending) < window:
+                try:
+                    job = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                future = executor.submit(function, job)
+                if ordered:
+                    pending.append((job, future))
+                else:
+                    pending[future] = job
+
+            if not pending:
+                return
+
+            if ordered:
+                job, future = pending.popleft()
+                if not future.done() and on_wait is not None:
+                    on_wait()
+
+                yield outcome(job, future)
+            else:
+                done = [future for future in pending if future.done()]
+                if not done:
+                    if on_wait is not None:
+                        on_wait()
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield outcome(pending.pop(future), future)
+
+
+def _entry(tmdb_entry, fields: tuple = _ENTRY_FIELDS) -> dict:
+    return {field: getattr(tmdb_entry, field) for field in fields}
+
+
+def _search(client: TMDbClient, arguments: argparse.Namespace, job: dict) -> dict:
+    fields = job.get("fields", arguments.fields)
+    search_results = client.search(query=job["query"], page=int(job.get("page", 1)),
+                                   language=job.get("language", arguments.language),
+                                   category=job.get("category", arguments.category),
+                                   year=job.get("year", arguments.year),
+                                   fields=None if fields is None else tuple(fields))
+
+    return {**job, "results": [_entry(tmdb_entry, _ENTRY_FIELDS if fields is None else fields)
+                               for tmdb_entry in search_results]}
+
+
+def _seasons(client: TMDbClient, arguments: argparse.Namespace, job: dict) -> dict:
+    return {**job, "seasons": client.seasons(series_id=str(job["series_id"]))}
+
+
+def _episodes(client: TMDbClient, arguments: argparse.Namespace, job: dict) -> dict:
+    episodes = client.episodes(series_id=str(job["series_id"]), season_id=str(job["season_id"]),
+                               language=job.get("language", arguments.language))
+
+    return {**job, "episodes": episodes}
+
+
+def _posters(client: TMDbClient, arguments: argparse.Namespace, job: dict) -> dict:
+    poster_id = str(job["poster_id"])
+    if not poster_id.isalnum():
+        raise ValueError(f"Invalid poster id '{poster_id}'.")
+
+    image = client.poster(poster_id=poster_id, max_width=arguments.max_width, max_height=arguments.max_height)
+
+    path = os.path.join(arguments.output_dir, f"{poster_id}.jpg")
+    with open(path, "wb") as file:
+        file.write(image.getbuffer())
+
+    return {**job, "path": path, "bytes": image.getbuffer().nbytes}
+
+
+# subcommand: (function, keys of plain input lines)
+_COMMANDS = {
+    "search": (_search, ("query",)),
+    "seasons": (_seasons, ("series_id",)),
+    "episodes": (_episodes, ("series_id", "season_id")),
+    "posters": (_posters, ("poster_id",)),
+}
+
+
+def parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(prog="tmdb", description="Batch requests to TMDb from JSONL on stdin.")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, default=8, help="number of concurrent requests (default: 8)")
+    common.add_argument("--rate", type=float, default=None, help="maximum number of requests per second")
+    common.add_argument("--cache-dir", default=None, help="directory of a disk cache shared between runs")
+    order = common.add_mutually_exclusive_group()
+    order.add_argument("--ordered", dest="ordered", action="store_true", default=True,
+                       help="write results in input order (default)")
+    order.add_argument("--unordered", dest="ordered", action="store_false",
+                       help="write results as they complete")
+    common.add_argument("--language", default="en", help="ISO-639-1 language code (default: en)")
+
+    subparsers = argument_parser.add_subparsers(dest="command", required=True)
+    search = subparsers.add_parser("search", parents=[common], help="search for movies and TV series")
+    search.add_argument("--category", choices=("movie", "tv"), default=None, help="search only movies or TV series")
+    search.add_argument("--year", type=int, default=None, help="release year")
+    search.add_argument("--fields", type=lambda fields: fields.split(","), default=None,
+                        help="comma-separated attributes to extract (e.g. category,tmdb_id,title)")
+    subparsers.add_parser("seasons", parents=[common], help="list the seasons of TV series")
+    subparsers.add_parser("episodes", parents=[common], help="list the episodes of TV series seasons")
+
+    posters = subparsers.add_parser("posters", parents=[common], help="download posters")
+    posters.add_argument("--output-dir", required=True, help="directory the posters are written to")
+    posters.add_argument("--max-width", type=int, default=None, help="smallest poster at least this wide")
+    posters.add_argument("--max-height", type=int, default=None, help="smallest poster at least this high")
+
+    return argument_parser
+
+
+def run(arguments: argparse.Namespace, client: TMDbClient, stdin: TextIO, stdout: TextIO) -> int:
+    """
+    Runs a subcommand on the jobs read from stdin.
+
+    :return: Exit status (1 if a job failed).
+    """
+
+    function, plain_keys = _COMMANDS[arguments.command]
+
+    if arguments.command == "posters":
+        os.makedirs(arguments.output_dir, exist_ok=True)
+
+    def job(line: str) -> dict:
+        return function(client, arguments, parse_line(line, plain_keys))
+
+    lines = (line for line in stdin if line.strip())
+
+    status = 0
+    for line, result, error in stream(job, lines, workers=arguments.workers, ordered=arguments.ordered,
+                                      on_wait=stdout.flush):
+        if error is not None:
+            status = 1
+            result = {"input": line.strip(), "error": f"{type(error).__name__}: {error}"}
+
+        stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    stdout.flush()
+
+    return status
+
+
+def main(argv: list = None) -> int:
+    argument_parser = parser()
+    arguments = argument_parser.parse_args(argv)
+
+    if arguments.workers < 1:
+        argument_parser.error("--workers must be at least 1")
+
+    if arguments.rate is not None and arguments.rate <= 0:
+        argument_parser.error("--rate must be greater than 0")
+
+    # a bounded cache keeps memory constant over millions of rows
+    cache = caching.MemoryCache(max_entries=10000) if arguments.cache_dir is None else \
+        caching.DiskCache(arguments.cache_dir)
+
+    with TMDbClient(rate_limit=arguments.rate, cache=cache) as client:
+        try:
+            return run(arguments, client, stdin=sys.stdin, stdout=sys.stdout)
+        except BrokenPipeError:
+            # the consumer of the output exited (e.g. "tmdb search | head"), discard the buffered output
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+        except KeyboardInterrupt:
+            return 130
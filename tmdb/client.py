@@ -0,0 +1,674 @@
+"""
+Instance-based access to TMDb. A TMDbClient owns its transport (HTTP sessions, timeouts, hedging, circuit breakers and
+rate limit), its cache and its HTML parser, so differently configured clients can be used in one process:
+
+    import tmdb
+
+    interactive = tmdb.TMDbClient(timeout=(2.0, 5.0), hedging=tmdb.resilience.Hedging(percentile=90))
+    crawler = tmdb.TMDbClient(rate_limit=2.0, cache=tmdb.caching.DiskCache("/var/cache/tmdb"))
+
+    interactive.search(query="Star Wars")
+
+API, Request and TMDbEntry use the default client (see default_client()).
+"""
+
+import io
+import random
+import re
+import sys
+import threading
+import time
+import weakref
+
+from collections import Counter
+from typing import TYPE_CHECKING, Optional
+
+from . import API, TMDbEntry, _data, _extract, caching, profiling, resilience
+
+if TYPE_CHECKING:
+    import concurrent.futures
+    import requests
+
+    from bs4 import BeautifulSoup
+
+    from . import identity, replay
+
+
+class TMDbClient:
+    """ Thread-safe client for the website <www.themoviedb.org>. """
+
+    def __init__(self, base_url: str = "https://www.themoviedb.org", timeout: tuple = (5.0, 30.0),
+                 hedging: resilience.Hedging = None, circuit_breakers: resilience.CircuitBreakers = None,
+                 rate_limit: float = None, cache: caching.CacheBackend = None, cache_ttl: float = None,
+                 parser: str = "html.parser", prefetch_workers: int = 4,
+                 identity_map: "identity.IdentityMap" = None, transport: "replay.Recorder | replay.Replayer" = None,
+                 profiler: profiling.Profiler = None):
+        """
+        :param base_url: URL of the TMDb website (e.g. a local stand-in server for tests).
+        :param timeout: Connect and read timeout in seconds.
+        :param hedging: Policy for hedged requests (disabled if None).
+        :param circuit_breakers: Circuit breakers per endpoint (disabled if None).
+        :param rate_limit: Maximum number of requests per second (unlimited if None).
+        :param cache: Cache backend (default: a new in-memory cache).
+        :param cache_ttl: Time to live of cached values in seconds (default: no expiry).
+        :param parser: Parser used by BeautifulSoup (e.g. "html.parser" or "lxml").
+        :param prefetch_workers: Number of threads fetching follow-up data of search results (see tmdb.prefetch).
+        :param identity_map: Map resolving search results to shared entries (see tmdb.identity, disabled if None).
+        :param transport: Transport recording or replaying the responses (see tmdb.replay, network if None).
+        :param profiler: Profiler timing the stages of requests and scrapers (see tmdb.profiling, disabled if None).
+        """
+
+        self.base_url = base_url
+        self.timeout = timeout
+        self.hedging = hedging
+        self.circuit_breakers = circuit_breakers
+        self.rate_limiter = None if rate_limit is None else resilience.RateLimiter(rate=rate_limit)
+        self.cache = caching.MemoryCache() if cache is None else cache
+        self.cache_ttl = cache_ttl
+        self.parser = parser
+        self.prefetch_workers = prefetch_workers
+        self.identity_map = identity_map
+        self.transport = transport
+        self.profiler = profiler
+
+        # cache "hits", "misses" and "stale" values returned while an endpoint is failing
+        self.cache_statistics = Counter()
+
+        # requests.Session is not thread-safe, every thread gets its own session (and connection pool), which is
+        # released when the thread exits
+        self._local = threading.local()
+        self._sessions = weakref.WeakSet()
+        self._executor = None
+        self._prefetch_executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "TMDbClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """ Closes the HTTP sessions and the transport and stops the threads for hedged requests and prefetching. """
+
+        with self._lock:
+            sessions, self._sessions = list(self._sessions), weakref.WeakSet()
+            executors = [self._executor, self._prefetch_executor]
+            self._executor = self._prefetch_executor = None
+
+        for session in sessions:
+            session.close()
+
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.transport is not None:
+            self.transport.close()
+
+    def _count_cache(self, outcome: str) -> None:
+        with self._lock:
+            self.cache_statistics[outcome] += 1
+
+    def _session(self) -> "requests.Session":
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+
+            session = self._local.session = requests.Session()
+            if self.profiler is not None:
+                # time the connection setup (DNS, TCP and TLS)
+                adapter = profiling.adapter()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+
+            # the thread-local holds the only reference, the connections are closed once the thread has exited
+            weakref.finalize(session, _close_adapters, list(session.adapters.values()))
+
+            with self._lock:
+                self._sessions.add(session)
+
+        return session
+
+    def _hedging_executor(self) -> "concurrent.futures.Executor":
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(thread_name_prefix="tmdb-hedging")
+
+            return self._executor
+
+    def _prefetcher(self) -> "concurrent.futures.Executor":
+        with self._lock:
+            if self._prefetch_executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._prefetch_executor = ThreadPoolExecutor(max_workers=self.prefetch_workers,
+                                                             thread_name_prefix="tmdb-prefetch")
+
+            return self._prefetch_executor
+
+    # transport
+    @profiling.profiled("get")
+    def get(self, path: str = "", query: str = "", stream: bool = False, headers: dict = None) -> "requests.Response":
+        """
+        Sends an HTTP GET request to TMDb and returns the response.
+
+        :param path: URL path.
+        :param query: URL query string.
+        :param stream: Set this parameter for downloading images.
+        :param headers: Additional request headers (e.g. "If-None-Match" for conditional requests).
+        :return: Response.
+        """
+
+        return self._request("GET", path=path, query=query, stream=stream, headers=headers)
+
+    @profiling.profiled("head")
+    def head(self, path: str = "", query: str = "", headers: dict = None) -> "requests.Response":
+        """
+        Sends an HTTP HEAD request to TMDb and returns the response (e.g. for the size of an image).
+
+        :param path: URL path.
+        :param query: URL query string.
+        :param headers: Additional request headers.
+        :return: Response without body.
+        """
+
+        # a HEAD response has no body to read
+        return self._request("HEAD", path=path, query=query, stream=True, headers=headers)
+
+    def _request(self, method: str, path: str, query: str, stream: bool,
+                 headers: Optional[dict]) -> "requests.Response":
+        # build a TMDb URL
+        url = f"{self.base_url}{path}?{query}"
+
+        # headers to send with the request
+        headers = {"User-Agent": random.choice(_data.USER_AGENTS), **(headers or {})}
+
+        # fail fast while the endpoint is failing
+        endpoint = resilience.endpoint(path)
+        circuit_breaker = None if self.circuit_breakers is None else self.circuit_breakers[endpoint]
+        if circuit_breaker is not None and not circuit_breaker.allow():
+            raise resilience.CircuitOpenError(f"Requests to www.themoviedb.org{endpoint} are currently failing.")
+
+        hedging = self.hedging
+        timeout = self.timeout
+        rate_limiter = self.rate_limiter
+        transport = self.transport
+
+        # GET responses are recorded by URL path and query (see tmdb.replay)
+        key = f"{path}?{query}" if method == "GET" else f"{method} {path}?{query}"
+
+        # profiled call (the body is streamed, so its transfer is timed separately)
+        call = profiling.current()
+        body_stream = stream or call is not None
+
+        def send() -> "requests.Response":
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+
+            # hedged requests are sent by other threads
+            with profiling.activate(call), profiling.stage("wait", exclude="connect"):
+                start = time.monotonic()
+                if transport is None:
+                    http_response = self._session().request(method, url, headers=headers, stream=body_stream,
+                                                            timeout=timeout)
+                else:
+                    http_response = transport.fetch(key, lambda: self._session().request(
+                        method, url, headers=headers, stream=body_stream, timeout=timeout))
+
+            if hedging is not None:
+                hedging.tracker(endpoint).record(time.monotonic() - start)
+
+            return http_response
+
+        # send the request using URL and headers (and a duplicate request if the first one is slow)
+        try:
+            if hedging is not None and not stream:
+                response = resilience.hedged(send, delay=hedging.delay(endpoint), executor=self._hedging_executor())
+            else:
+                response = send()
+        except BaseException:
+            # any error (also of a transport, e.g. a replay miss) ends the trial request of a half-open breaker
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure()
+            raise
+
+        # server errors and rate limiting count as failures of the endpoint
+        if circuit_breaker is not None:
+            if response.status_code >= 500 or response.status_code == 429:
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+
+        if call is not None:
+            call.url, call.status_code = url, response.status_code
+
+            # streamed bodies (images) are read by the caller, HEAD responses have none
+            if stream:
+                call.size = int(response.headers.get("Content-Length", 0))
+            else:
+                with profiling.stage("transfer"):
+                    call.size = len(response.content)
+
+        # if the response status code was between 200 and 400, return the response
+        if response:
+            return response
+
+        # HTTP 404: The requested resource was not found
+        if response.status_code == 404:
+            raise Exception(f"The resource www.themoviedb.org{path} does not exist.")
+
+        # other HTTP status codes
+        raise Exception(f"An error occurred while handling your request to www.themoviedb.org{path}.")
+
+    @profiling.profiled("image")
+    def image(self, file_path: str) -> io.BytesIO:
+        """
+        Downloads an image from TMDb (or returns it from the cache if it was prefetched).
+
+        :param file_path: Path to the image.
+        :return: Image as BytesIO.
+        """
+
+        content = self.cache.get(caching.make_key("image", [file_path]))
+        if content is None:
+            self._count_cache("misses")
+            content = self._content(self.get(path=file_path, stream=True))
+        else:
+            self._count_cache("hits")
+
+        return io.BytesIO(content)
+
+    @profiling.profiled("image")
+    def prefetch_image(self, file_path: str) -> None:
+        """
+        Downloads an image into the cache. Only prefetched images are cached, images are large and rarely requested
+        twice otherwise.
+
+        :param file_path: Path to the image.
+        """
+
+        key = caching.make_key("image", [file_path])
+        if not self.cache.exists(key):
+            self.cache.set(key, self._content(self.get(path=file_path, stream=True)), ttl=self.cache_ttl)
+
+    @staticmethod
+    def _content(response: "requests.Response") -> bytes:
+        # body of a streamed response
+        with profiling.stage("transfer"):
+            content = response.content
+
+        call = profiling.current()
+        if call is not None:
+            call.size = len(content)
+
+        return content
+
+    def parse(self, markup: str) -> "BeautifulSoup":
+        """
+        Parses an HTML page to a BeautifulSoup object using the parser of the client.
+
+        :param markup: HTML page as string.
+        :return: BeautifulSoup object.
+        """
+
+        from bs4 import BeautifulSoup
+
+        with profiling.stage("parse"):
+            return BeautifulSoup(markup, features=self.parser)
+
+    def _html(self, response: "requests.Response") -> "BeautifulSoup":
+        # decoding and parsing are timed separately by the profiler
+        with profiling.stage("decode"):
+            markup = response.text
+
+        return self.parse(markup)
+
+    # scrapers
+    @profiling.profiled("languages")
+    @caching.cached("languages")
+    def languages(self, iso_639: bool = True) -> list:
+        """
+        Returns a list of languages supported by TMDb.
+
+        :param iso_639: Return ISO-639-1 formatted language codes.
+        :return: List of supported languages as IETF language tags.
+        """
+
+        # get HTTP response for the TMDb start page
+        response = self.get()
+        html_page = self._html(response)
+
+        with profiling.stage("extract"):
+            return _extract.languages(html_page, iso_639=iso_639)
+
+    @profiling.profiled("categories")
+    @caching.cached("categories")
+    def categories(self) -> list:
+        """
+        Returns a list of categories supported by TMDb.
+
+        :return: List of supported categories as strings.
+        """
+
+        # get HTTP response for the TMDb search page
+        response = self.get(path="/search")
+        html_page = self._html(response)
+
+        with profiling.stage("extract"):
+            return _extract.categories(html_page)
+
+    def search(self, query: str = '', page: int = 1, language: str = "en", recursive: bool = False,
+               max_pages: int = 10, prefetch: tuple = (), prefetch_budget: int = 20, category: str = None,
+               year: int = None, fields: tuple = None) -> list:
+        """
+        Search for movies or tv series by their original, translated and alternative titles.
+
+        With a category, only the search result pages of that category are fetched. With a year, cards released in
+        other years are skipped during extraction. With fields, only these attributes of the entries are extracted
+        (e.g. ("category", "tmdb_id", "title") for autocompletion), the others are None.
+
+        With a prefetch policy, the follow-up data of the results is fetched into the cache in the background and the
+        results are returned as tmdb.prefetch.SearchResults, whose prefetch attribute can wait for or cancel the
+        fetches.
+
+        :param prefetch: Follow-up data to prefetch, e.g. ("posters:low", "seasons", "episodes:1").
+        :param prefetch_budget: Maximum number of prefetch requests.
+        :param category: Search only "movie" or "tv".
+        :param year: Release year.
+        :param fields: Attributes to extract (default: all, see tmdb._extract.SEARCH_FIELDS).
+        """
+
+        if category is not None and category not in ("movie", "tv"):
+            raise ValueError("Search category must be 'movie' or 'tv'.")
+
+        if year is not None:
+            year = str(year)
+            if not re.fullmatch(r"\d{4}", year):
+                raise ValueError("Search year must be a four-digit year.")
+
+        if fields is not None:
+            if isinstance(fields, str) or not set(fields) <= set(_extract.SEARCH_FIELDS):
+                raise ValueError(f"Search fields must be a tuple of: {', '.join(_extract.SEARCH_FIELDS)}.")
+
+            # equal projections share cache keys
+            fields = tuple(field for field in _extract.SEARCH_FIELDS if field in fields)
+
+        search_results = self._search(query=query, page=page, language=language, recursive=recursive,
+                                      max_pages=max_pages, category=category, year=year, fields=fields)
+
+        # the same title found by several pages or queries is one shared object
+        if self.identity_map is not None:
+            search_results = self.identity_map.resolve_all(search_results)
+
+        # follow-up requests of the entries (posters, seasons, episodes) are sent by this client
+        for tmdb_entry in search_results:
+            tmdb_entry._client = self
+
+        if prefetch:
+            from . import prefetch as _prefetch
+
+            return _prefetch.start(self, search_results, policy=prefetch, budget=prefetch_budget,
+                                   executor=self._prefetcher())
+
+        return search_results
+
+    @profiling.profiled("search")
+    @caching.cached("search")
+    def _search(self, query: str = '', page: int = 1, language: str = "en", recursive: bool = False,
+                max_pages: int = 10, category: str = None, year: str = None, fields: tuple = None) -> list:
+        # build a search request for TMDb (category pages, e.g. "/search/movie", only contain their category)
+        path = '/search' if category is None else f'/search/{category}'
+        query_string = f"language={language}&page={page}&query={query}"
+
+        # get response from TMDb request
+        response = self.get(path=path, query=query_string)
+
+        # parse response to BeautifulSoup object
+        html_page = self._html(response)
+
+        # get search results from html page
+        with profiling.stage("extract"):
+            search_results = _extract.search_results(html_page, language=language, category=category, year=year,
+                                                     fields=_extract.SEARCH_FIELDS if fields is None else fields)
+            next_page = _extract.has_next_page(html_page)
+
+        # if recursive is set, call search for every page after the current
+        if recursive and max_pages > 1:
+            if next_page:
+                search_results += self._search(query=query, page=page + 1, language=language, recursive=True,
+                                               max_pages=max_pages - 1, category=category, year=year,
+                                               fields=fields)
+
+        return search_results
+
+    def search_multilang(self, query: str = '', languages: list = ("en",), page: int = 1,
+                         recursive: bool = False, max_pages: int = 10, max_workers: int = None, category: str = None,
+                         year: int = None, fields: tuple = None) -> list:
+        """
+        Search for movies or tv series in several languages at once. The search result pages for all languages are
+        fetched concurrently and merged into one record per (category, tmdb_id).
+
+        :param query: Search query.
+        :param languages: ISO-639-1 language codes to search in.
+        :param page: Search result page.
+        :param recursive: Search the following result pages as well.
+        :param max_pages: Maximum number of result pages per language.
+        :param max_workers: Maximum number of concurrent requests (default: one per language).
+        :param category: Search only "movie" or "tv".
+        :param year: Release year.
+        :param fields: Attributes to extract in addition to category and tmdb_id (default: all, see search()).
+                       Attributes not extracted are missing from the records (None or empty).
+        :return: List of dictionaries with localized titles, descriptions and poster ids keyed by language.
+        """
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        languages = list(dict.fromkeys(languages))
+        if not languages:
+            return []
+
+        # fetch the search results for every language concurrently
+        # the records are merged by category and tmdb_id, which are extracted with every projection
+        if fields is not None and not isinstance(fields, str):
+            fields = ("category", "tmdb_id", *fields)
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(languages)) as executor:
+            results_per_language = list(executor.map(
+                lambda language: self.search(query=query, page=page, language=language, recursive=recursive,
+                                             max_pages=max_pages, category=category, year=year, fields=fields),
+                languages))
+
+        # merge search results by (category, tmdb_id), keeping the order of first appearance
+        records = {}
+        for language, search_results in zip(languages, results_per_language):
+            for tmdb_entry in search_results:
+                key = (tmdb_entry.category, tmdb_entry.tmdb_id)
+
+                record = records.get(key)
+                if record is None:
+                    record = records[key] = {"category": tmdb_entry.category, "tmdb_id": tmdb_entry.tmdb_id,
+                                             "release_year": tmdb_entry.release_year, "titles": {},
+                                             "descriptions": {}, "poster_ids": {}}
+
+                if record["release_year"] is None:
+                    record["release_year"] = tmdb_entry.release_year
+
+                if tmdb_entry.title is not None:
+                    record["titles"][language] = tmdb_entry.title
+
+                if tmdb_entry.description is not None:
+                    record["descriptions"][language] = tmdb_entry.description
+
+                # poster ids are mostly shared between languages, store every distinct id only once
+                if tmdb_entry.poster_id is not None:
+                    record["poster_ids"][language] = sys.intern(tmdb_entry.poster_id)
+
+        return list(records.values())
+
+    def poster(self, poster_id: str, max_width: int = None, max_height: int = None,
+               preferred: tuple = ()) -> io.BytesIO:
+        """
+        Downloads the smallest poster that covers a box of max_width x max_height pixels (original resolution if
+        neither is given).
+
+        :param poster_id: The poster ID.
+        :param max_width: Width of the box.
+        :param max_height: Height of the box.
+        :param preferred: Poster variants preferred if they are not much larger (see API.poster_size()).
+        :return: Poster image.
+        """
+
+        size = None
+        if max_width is not None or max_height is not None:
+            size = API.poster_size(max_width=max_width, max_height=max_height, preferred=preferred)
+
+        if size is None:
+            return self.image(file_path=API.poster_path(poster_id=poster_id, original_resolution=True))
+
+        return self.image(file_path=API.poster_path(poster_id=poster_id, width=size[0], height=size[1]))
+
+    def posters(self, tmdb_entries: list, max_width: int = None, max_height: int = None, max_workers: int = 8,
+                measure_savings: bool = False) -> tuple:
+        """
+        Downloads the posters for a list of TMDbEntry objects concurrently, each in the smallest size that covers
+        a box of max_width x max_height pixels.
+
+        :param tmdb_entries: List of TMDbEntry objects.
+        :param max_width: Width of the box.
+        :param max_height: Height of the box.
+        :param max_workers: Maximum number of concurrent downloads.
+        :param measure_savings: Request the size of the original images (headers only) to report the bytes saved.
+        :return: Tuple of the list of poster images (None for entries without a poster) and a Counter with the
+                 statistics "posters", "bytes" and, with measure_savings, "bytes_original" and "bytes_saved".
+        """
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        def download(tmdb_entry: TMDbEntry) -> tuple:
+            statistics = Counter()
+
+            if tmdb_entry.poster_id is None:
+                return None, statistics
+
+            image = self.poster(poster_id=tmdb_entry.poster_id, max_width=max_width, max_height=max_height,
+                                preferred=tmdb_entry.poster_variants)
+
+            statistics["posters"] += 1
+            statistics["bytes"] += image.getbuffer().nbytes
+
+            if measure_savings:
+                # only the headers of the original image are requested
+                response = self.head(path=API.poster_path(poster_id=tmdb_entry.poster_id))
+
+                original = int(response.headers.get("Content-Length", 0))
+                statistics["bytes_original"] += original
+                statistics["bytes_saved"] += max(0, original - image.getbuffer().nbytes)
+
+            return image, statistics
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(download, tmdb_entries))
+
+        statistics = Counter()
+        for _, poster_statistics in results:
+            statistics.update(poster_statistics)
+
+        return [image for image, _ in results], statistics
+
+    @profiling.profiled("tv.seasons")
+    @caching.cached("tv.seasons")
+    def seasons(self, series_id: str) -> list:
+        """
+        Returns a list of all seasons for a TV series.
+
+        :param series_id: The TMDb id of the TV series.
+        :return: List of seasons.
+        """
+
+        # build a request for TMDb
+        path = f"/tv/{series_id}/seasons"
+
+        # get response from TMDb request
+        response = self.get(path=path)
+        html_page = self._html(response)
+
+        with profiling.stage("extract"):
+            return _extract.seasons(html_page)
+
+    def number_of_seasons(self, series_id: str) -> int:
+        """
+        Returns the season count for a TV series (without season "0").
+
+        :param series_id: The TMDb id of the TV series.
+        :return: Number of seasons.
+        """
+
+        return len([season for season in self.seasons(series_id=series_id) if season != "0"])
+
+    @profiling.profiled("tv.episodes")
+    @caching.cached("tv.episodes")
+    def episodes(self, series_id: str, season_id: str, language: str = "en") -> list:
+        """
+        Returns a list of episodes for a TV series season.
+
+        :param series_id: The TMDb id of the TV series.
+        :param season_id: The season id.
+        :param language: ISO-639-1 language code.
+        :return: List of episodes as dictionaries with the keys "number" and "title".
+        """
+
+        # build a request for TMDb
+        path = f"/tv/{series_id}/season/{season_id}"
+        query = f"language={language}"
+
+        # get response from TMDb request
+        response = self.get(path=path, query=query)
+        html_page = self._html(response)
+
+        with profiling.stage("extract"):
+            return _extract.episodes(html_page)
+
+
+def _close_adapters(adapters: list) -> None:
+    for adapter in adapters:
+        adapter.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def default_client() -> TMDbClient:
+    """
+    Returns the client used by API, Request and TMDbEntry. It is created on first use.
+
+    :return: Default client.
+    """
+
+    global _default_client
+
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = TMDbClient()
+
+    return _default_client
+
+
+def set_default_client(client: Optional[TMDbClient]) -> None:
+    """
+    Replaces the client used by API, Request and TMDbEntry.
+
+    :param client: Client (None to create a new default client on next use).
+    """
+
+    global _default_client
+
+    if client is not None and not isinstance(client, TMDbClient):
+        raise TypeError("Default client must be a TMDbClient.")
+
+    with _default_client_lock:
+        _default_client = client
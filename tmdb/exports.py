@@ -0,0 +1,266 @@
+"""
+Ingestion of the daily ID exports of TMDb (gzipped JSON lines with the id and original title of every movie and TV
+series). Exports are decompressed and parsed as a stream, so memory use does not depend on their size:
+
+    import datetime
+
+    from tmdb import exports
+
+    store = exports.ExportStore("catalog.sqlite")
+
+    url = exports.export_url("movie", datetime.date(2024, 5, 1))
+    statistics = store.ingest(exports.read(url, category="movie"), category="movie")
+
+    # ids added and removed since the previous ingested export
+    for tmdb_entry in store.added("movie"):
+        print(tmdb_entry.tmdb_id, tmdb_entry.title)
+
+Sources can be URLs or local files (compressed or not).
+"""
+
+import datetime
+import io
+import itertools
+import threading
+
+from collections import Counter
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from . import TMDbEntry
+
+EXPORTS_URL = "http://files.tmdb.org/p/exports"
+
+# file name prefix and title key of the exports per category
+EXPORTS = {
+    "movie": ("movie_ids", "original_title"),
+    "tv": ("tv_series_ids", "original_name"),
+}
+
+# number of rows written or read per batch (an ingest is a single transaction)
+BATCH_SIZE = 10000
+
+
+def export_url(category: str, date: datetime.date) -> str:
+    """
+    Returns the URL of the ID export of a category (exports are published daily).
+
+    :param category: "movie" or "tv".
+    :param date: Date of the export.
+    :return: URL.
+    """
+
+    if category not in EXPORTS:
+        raise ValueError("Export category must be 'movie' or 'tv'.")
+
+    return f"{EXPORTS_URL}/{EXPORTS[category][0]}_{date:%m_%d_%Y}.json.gz"
+
+
+def open_export(source: str, timeout: tuple = (5.0, 30.0)) -> io.TextIOBase:
+    """
+    Opens an export as a stream of text lines, decompressing it while it is read.
+
+    :param source: URL or path of the export.
+    :param timeout: Connect and read timeout in seconds for URLs.
+    :return: Text stream.
+    """
+
+    import gzip
+
+    if source.startswith(("http://", "https://")):
+        import requests
+
+        response = requests.get(source, stream=True, timeout=timeout)
+        if not response:
+            response.close()
+            raise Exception(f"An error occurred while downloading the export {source}.")
+
+        # a transfer encoding (e.g. gzip over gzip) is removed by urllib3, the file itself is decompressed below
+        response.raw.decode_content = True
+        # keep the stream open at the end of the body, the buffered reader closes it
+        response.raw.auto_close = False
+        binary = io.BufferedReader(response.raw)
+    else:
+        binary = open(source, "rb")
+
+    # gzip magic number
+    if binary.peek(2)[:2] == b"\x1f\x8b":
+        binary = gzip.GzipFile(fileobj=binary)
+
+    return io.TextIOWrapper(binary, encoding="utf-8")
+
+
+def read(source: str, category: str, statistics: Counter = None) -> Iterator["TMDbEntry"]:
+    """
+    Reads the entries of an export. Entries are built without validation; lines that are not valid JSON objects with
+    an id are skipped. A truncated compressed export raises EOFError when its end is reached, so an ingest of it is
+    rolled back.
+
+    :param source: URL or path of the export.
+    :param category: "movie" or "tv".
+    :param statistics: Counter receiving the number of "lines" and "skipped" lines.
+    :return: Iterator of entries with category, tmdb_id and title.
+    """
+
+    import json
+
+    from . import TMDbEntry
+
+    if category not in EXPORTS:
+        raise ValueError("Export category must be 'movie' or 'tv'.")
+
+    title_key = EXPORTS[category][1]
+    statistics = Counter() if statistics is None else statistics
+
+    with open_export(source) as lines:
+        for line in lines:
+            statistics["lines"] += 1
+
+            try:
+                row = json.loads(line)
+                tmdb_id = str(row["id"])
+            except (ValueError, TypeError, KeyError):
+                statistics["skipped"] += 1
+                continue
+
+            yield TMDbEntry._unchecked(category=category, tmdb_id=tmdb_id, title=row.get(title_key))
+
+
+class ExportStore:
+    """
+    On-disk store (SQLite) of the entries of the ingested exports. Each ingest replaces the entries of a category and
+    records which ids were added and removed compared to the previous ingest.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the database file.
+        """
+
+        import sqlite3
+
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._connection:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    category TEXT NOT NULL, tmdb_id TEXT NOT NULL, title TEXT,
+                    generation INTEGER NOT NULL, first_generation INTEGER NOT NULL,
+                    PRIMARY KEY (category, tmdb_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS removed (
+                    category TEXT NOT NULL, tmdb_id TEXT NOT NULL, title TEXT,
+                    PRIMARY KEY (category, tmdb_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS generations (
+                    category TEXT PRIMARY KEY, generation INTEGER NOT NULL
+                );
+            """)
+
+    def __enter__(self) -> "ExportStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def ingest(self, tmdb_entries: Iterable["TMDbEntry"], category: str) -> Counter:
+        """
+        Replaces the entries of a category with the entries of an export, writing them in batches.
+
+        :param tmdb_entries: Entries of the export (e.g. from read()).
+        :param category: "movie" or "tv".
+        :return: Counter with the number of "entries", "added" and "removed" ids.
+        """
+
+        if category not in EXPORTS:
+            raise ValueError("Export category must be 'movie' or 'tv'.")
+
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT generation FROM generations WHERE category = ?",
+                                           (category,)).fetchone()
+            generation = 1 if row is None else row[0] + 1
+
+            tmdb_entries = iter(tmdb_entries)
+            while batch := list(itertools.islice(tmdb_entries, BATCH_SIZE)):
+                self._connection.executemany(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT (category, tmdb_id) "
+                    "DO UPDATE SET title = excluded.title, generation = excluded.generation",
+                    [(category, tmdb_entry.tmdb_id, tmdb_entry.title, generation, generation)
+                     for tmdb_entry in batch])
+
+            # ids missing from this export were removed
+            self._connection.execute("DELETE FROM removed WHERE category = ?", (category,))
+            self._connection.execute("INSERT INTO removed SELECT category, tmdb_id, title FROM entries "
+                                     "WHERE category = ? AND generation < ?", (category, generation))
+            self._connection.execute("DELETE FROM entries WHERE category = ? AND generation < ?",
+                                     (category, generation))
+
+            self._connection.execute("INSERT OR REPLACE INTO generations VALUES (?, ?)", (category, generation))
+
+            statistics = Counter()
+            statistics["entries"] = self._count("SELECT COUNT(*) FROM entries WHERE category = ?", category)
+            statistics["added"] = self._count("SELECT COUNT(*) FROM entries WHERE category = ? "
+                                              "AND first_generation = ?", category, generation)
+            statistics["removed"] = self._count("SELECT COUNT(*) FROM removed WHERE category = ?", category)
+
+        return statistics
+
+    def _count(self, query: str, *parameters) -> int:
+        return self._connection.execute(query, parameters).fetchone()[0]
+
+    def _entries(self, query: str, *parameters) -> Iterator["TMDbEntry"]:
+        from . import TMDbEntry
+
+        # rows are fetched in batches, the cursor is not shared with other threads
+        with self._lock:
+            cursor = self._connection.execute(query, parameters)
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(BATCH_SIZE)
+
+            if not rows:
+                return
+
+            for category, tmdb_id, title in rows:
+                yield TMDbEntry._unchecked(category=category, tmdb_id=tmdb_id, title=title)
+
+    def entries(self, category: str) -> Iterator["TMDbEntry"]:
+        """
+        Returns the entries of a category.
+
+        :param category: "movie" or "tv".
+        :return: Iterator of entries.
+        """
+
+        return self._entries("SELECT category, tmdb_id, title FROM entries WHERE category = ?", category)
+
+    def added(self, category: str) -> Iterator["TMDbEntry"]:
+        """
+        Returns the entries added by the last ingest of a category (all entries after the first ingest).
+
+        :param category: "movie" or "tv".
+        :return: Iterator of entries.
+        """
+
+        return self._entries("SELECT category, tmdb_id, title FROM entries WHERE category = ? AND first_generation = "
+                             "(SELECT generation FROM generations WHERE category = ?)", category, category)
+
+    def removed(self, category: str) -> Iterator["TMDbEntry"]:
+        """
+        Returns the entries removed by the last ingest of a category.
+
+        :param category: "movie" or "tv".
+        :return: Iterator of entries.
+        """
+
+        return self._entries("SELECT category, tmdb_id, title FROM removed WHERE category = ?", category)
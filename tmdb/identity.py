@@ -0,0 +1,90 @@
+"""
+Identity map resolving every TMDb entry to a single shared TMDbEntry object. Entries are held by weak references, so
+an entry is dropped from the map as soon as no search result references it anymore:
+
+    import tmdb
+
+    client = tmdb.TMDbClient(identity_map=tmdb.identity.IdentityMap())
+
+    # the same title found on several pages or by several queries is the same object
+    client.search(query="Star Wars")[0] is client.search(query="Star Wars: Episode IV")[0]
+"""
+
+import threading
+import weakref
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from . import TMDbEntry
+
+# fields filled in on the shared entry if a later appearance knows them
+_FIELDS = ("title", "release_year", "description", "poster_id")
+
+
+class IdentityMap:
+    """
+    Thread-safe weak-reference map from (category, tmdb_id, language) to the shared TMDbEntry. The language is part of
+    the key because titles and descriptions are localized.
+    """
+
+    def __init__(self):
+        self._entries = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, category: str, tmdb_id: str, language: str = "en") -> Optional["TMDbEntry"]:
+        """
+        Returns the shared entry for a TMDb id.
+
+        :param category: Category ("movie" or "tv").
+        :param tmdb_id: The TMDb id.
+        :param language: ISO-639-1 language code.
+        :return: Shared entry or None if no entry is referenced.
+        """
+
+        return self._entries.get((category, tmdb_id, language))
+
+    def resolve(self, tmdb_entry: "TMDbEntry") -> "TMDbEntry":
+        """
+        Returns the shared entry equal to the given one and registers the given entry if there is none. Fields the
+        shared entry lacks are taken from the given entry.
+
+        :param tmdb_entry: Entry.
+        :return: Shared entry.
+        """
+
+        # entries without an id can not be identified
+        if tmdb_entry.category is None or tmdb_entry.tmdb_id is None:
+            return tmdb_entry
+
+        key = (tmdb_entry.category, tmdb_entry.tmdb_id, tmdb_entry.language)
+
+        with self._lock:
+            shared = self._entries.setdefault(key, tmdb_entry)
+
+            if shared is not tmdb_entry:
+                for field in _FIELDS:
+                    if getattr(shared, field) is None and getattr(tmdb_entry, field) is not None:
+                        setattr(shared, field, getattr(tmdb_entry, field))
+
+                if not shared.poster_variants:
+                    shared.poster_variants = tmdb_entry.poster_variants
+
+        return shared
+
+    def resolve_all(self, tmdb_entries: list) -> list:
+        """
+        Resolves a list of entries (see resolve()).
+
+        :param tmdb_entries: List of entries.
+        :return: List of shared entries in the same order.
+        """
+
+        return [self.resolve(tmdb_entry) for tmdb_entry in tmdb_entries]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,184 @@
+"""
+Speculative prefetch of the follow-up data of search results. The fetches run in the background and store their
+results in the cache of the client, so the follow-up calls of TMDbEntry are answered without a round trip:
+
+    import tmdb
+
+    search_results = tmdb.API.search(query="Star Wars", prefetch=("posters:low", "seasons", "episodes:1"))
+
+    search_results[0].poster("low")     # answered from the cache once prefetched
+
+Pending fetches are cancelled when the search results are garbage collected or search_results.prefetch.cancel() is
+called. At most prefetch_budget requests are sent per search.
+"""
+
+import threading
+import weakref
+
+from collections import Counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import concurrent.futures
+
+    from . import TMDbEntry
+    from .client import TMDbClient
+
+RESOLUTIONS = ("low", "medium", "high", "original")
+
+
+class SearchResults(list):
+    """ List of search results with the handle of their prefetch. """
+
+    prefetch = None
+
+
+def parse_policy(policy: tuple) -> list:
+    """
+    Parses a prefetch policy, e.g. ("posters:low", "seasons", "episodes:1").
+
+    :param policy: Follow-up data to prefetch: "posters[:<resolution>]", "seasons" and "episodes:<season id>".
+    :return: List of (kind, argument) tuples.
+    """
+
+    if isinstance(policy, str):
+        policy = (policy,)
+
+    parsed = []
+    for item in policy:
+        kind, _, argument = item.partition(":")
+
+        match kind:
+            case "posters":
+                argument = argument or "low"
+                if argument not in RESOLUTIONS:
+                    raise ValueError("Prefetch resolution must be 'low', 'medium', 'high' or 'original'.")
+            case "seasons" if not argument:
+                pass
+            case "episodes" if argument.isdigit():
+                pass
+            case _:
+                raise ValueError(f"Prefetch policy items must be 'posters[:<resolution>]', 'seasons' or "
+                                 f"'episodes:<season id>', not '{item}'.")
+
+        parsed.append((kind, argument))
+
+    return parsed
+
+
+class Prefetch:
+    """
+    Background fetches of the follow-up data of a list of search results. The statistics count the fetches that were
+    "sent", "failed", "cancelled" and "skipped" (over budget).
+    """
+
+    def __init__(self, client: "TMDbClient", tmdb_entries: list, policy: tuple, budget: int,
+                 executor: "concurrent.futures.Executor"):
+        """
+        :param client: Client sending the requests and caching their results.
+        :param tmdb_entries: Search results.
+        :param policy: Follow-up data to prefetch (see parse_policy()).
+        :param budget: Maximum number of requests.
+        :param executor: Executor running the fetches.
+        """
+
+        if budget < 0:
+            raise ValueError("Prefetch budget must not be negative.")
+
+        self.statistics = Counter()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._futures = []
+
+        policy = parse_policy(policy)
+
+        # fetches in the order of the result cards, the first cards are shown first
+        tasks = [task for tmdb_entry in tmdb_entries for task in self._tasks(client, tmdb_entry, policy)]
+
+        self.statistics["skipped"] = max(0, len(tasks) - budget)
+        for task in tasks[:budget]:
+            self._futures.append(executor.submit(self._run, task))
+
+    @staticmethod
+    def _tasks(client: "TMDbClient", tmdb_entry: "TMDbEntry", policy: list) -> list:
+        # the tasks reference the entries' fields only, never the result list (see SearchResults)
+        tasks = []
+        for kind, argument in policy:
+            match kind:
+                case "posters" if tmdb_entry.poster_id is not None:
+                    file_path = tmdb_entry._poster_path(argument)
+                    tasks.append(lambda file_path=file_path: client.prefetch_image(file_path=file_path))
+                case "seasons" if tmdb_entry.is_tv():
+                    tasks.append(lambda series_id=tmdb_entry.tmdb_id: client.seasons(series_id=series_id))
+                case "episodes" if tmdb_entry.is_tv():
+                    tasks.append(lambda series_id=tmdb_entry.tmdb_id, season_id=argument, language=tmdb_entry.language:
+                                 client.episodes(series_id=series_id, season_id=season_id, language=language))
+
+        return tasks
+
+    def _run(self, task) -> None:
+        if self._cancelled.is_set():
+            self._count("cancelled")
+            return
+
+        try:
+            task()
+        except Exception:
+            # a failed prefetch is retried by the follow-up call
+            self._count("failed")
+        else:
+            self._count("sent")
+
+    def _count(self, statistic: str) -> None:
+        with self._lock:
+            self.statistics[statistic] += 1
+
+    @property
+    def done(self) -> bool:
+        return all(future.done() for future in self._futures)
+
+    def cancel(self) -> None:
+        """ Cancels the fetches that have not been started yet. Running fetches are completed. """
+
+        self._cancelled.set()
+
+        for future in self._futures:
+            if future.cancel():
+                self._count("cancelled")
+
+    def wait(self, timeout: float = None) -> Counter:
+        """
+        Waits until all fetches are completed or cancelled.
+
+        :param timeout: Maximum time to wait in seconds.
+        :return: Statistics.
+        """
+
+        from concurrent.futures import wait
+
+        wait(self._futures, timeout=timeout)
+
+        return self.statistics
+
+
+def start(client: "TMDbClient", search_results: list, policy: tuple, budget: int,
+          executor: "concurrent.futures.Executor") -> SearchResults:
+    """
+    Starts the prefetch for search results and returns them as SearchResults. The prefetch is cancelled when the
+    returned list is garbage collected.
+
+    :param client: Client sending the requests.
+    :param search_results: Search results.
+    :param policy: Follow-up data to prefetch (see parse_policy()).
+    :param budget: Maximum number of requests.
+    :param executor: Executor running the fetches.
+    :return: Search results with the prefetch handle.
+    """
+
+    results = SearchResults(search_results)
+    results.prefetch = Prefetch(client, search_results, policy=policy, budget=budget, executor=executor)
+
+    # the handle must not keep the results alive, otherwise the finalizer never runs
+    weakref.finalize(results, results.prefetch.cancel)
+
+    return results
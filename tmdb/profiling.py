@@ -0,0 +1,313 @@
+"""
+Opt-in per-stage profiling of the requests and scrapers of a client. Every call is split into the stages "connect"
+(DNS, TCP and TLS), "wait" (until the response headers arrive), "transfer" (response body), "decode"
+(response.text), "parse" (BeautifulSoup tree) and "extract". The slowest calls are kept with their stage breakdown,
+URL and response size:
+
+    import tmdb
+
+    from tmdb import profiling
+
+    profiler = profiling.Profiler(capacity=20, profile_threshold=2.0)
+    client = tmdb.TMDbClient(profiler=profiler)
+
+    client.episodes(series_id="1396", season_id="1")
+
+    for call in profiler.slowest():
+        print(call)             # tv.episodes 4.012s /tv/1396/season/1 (84211 bytes) wait=3.1 parse=0.6 ...
+        print(call.profile)     # cProfile statistics of calls slower than profile_threshold
+
+    print(profiler.summary())   # seconds per stage over all calls
+
+Calls answered from the cache are profiled as well (without stages). Connections are reused, so "connect" is only
+timed for the first request of a connection.
+"""
+
+import functools
+import heapq
+import itertools
+import threading
+import time
+
+from collections import Counter
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests.adapters
+
+STAGES = ("connect", "wait", "transfer", "decode", "parse", "extract")
+
+# call profiled by the current thread
+_local = threading.local()
+
+# only one thread can run cProfile at a time (since Python 3.12, a second one fails to enable it)
+_cprofile_lock = threading.Lock()
+
+
+class Call:
+    """ Stage breakdown of a profiled call. """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.url = None
+        self.status_code = None
+        self.size = 0
+        self.stages = Counter()
+        self.started = time.time()
+        self.duration = 0.0
+        self.profile = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        stages = " ".join(f"{stage}={self.stages[stage]:.3f}" for stage in STAGES if stage in self.stages)
+        return f"{self.name} {self.duration:.3f}s {self.url} ({self.size} bytes) {stages}"
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] += seconds
+
+
+class Profiler:
+    """ Thread-safe collector keeping the slowest profiled calls. """
+
+    def __init__(self, capacity: int = 50, threshold: float = 0.0, profile_threshold: float = None):
+        """
+        :param capacity: Number of slowest calls kept.
+        :param threshold: Calls faster than this (in seconds) are only counted in the summary.
+        :param profile_threshold: Run calls under cProfile and keep the statistics of calls slower than this (in
+                                  seconds, disabled if None). Only one call at a time runs under cProfile, calls
+                                  started meanwhile get no statistics. cProfile slows the calls down considerably.
+        """
+
+        if capacity < 1:
+            raise ValueError("Profiler capacity must be at least 1.")
+
+        self.capacity = capacity
+        self.threshold = threshold
+        self.profile_threshold = profile_threshold
+        self._slowest = []
+        self._summary = Counter()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def record(self, call: Call) -> None:
+        with self._lock:
+            self._summary["calls"] += 1
+            self._summary.update(call.stages)
+
+            if call.duration < self.threshold:
+                return
+
+            # min-heap of the slowest calls (the counter breaks ties between equal durations)
+            item = (call.duration, next(self._counter), call)
+            if len(self._slowest) < self.capacity:
+                heapq.heappush(self._slowest, item)
+            elif call.duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def slowest(self) -> list:
+        """
+        Returns the slowest calls.
+
+        :return: List of calls, slowest first.
+        """
+
+        with self._lock:
+            return [call for _, _, call in sorted(self._slowest, reverse=True)]
+
+    def summary(self) -> Counter:
+        """
+        Returns the number of "calls" and the seconds spent in every stage over all profiled calls.
+
+        :return: Counter.
+        """
+
+        with self._lock:
+            return Counter(self._summary)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slowest.clear()
+            self._summary.clear()
+
+
+def current() -> Optional[Call]:
+    """
+    Returns the call profiled by the current thread.
+
+    :return: Call or None.
+    """
+
+    return getattr(_local, "call", None)
+
+
+class activate:
+    """ Context manager making a call the current call of the thread (e.g. in the threads of hedged requests). """
+
+    def __init__(self, call: Optional[Call]):
+        self.call = call
+
+    def __enter__(self) -> Optional[Call]:
+        self._previous = current()
+        _local.call = self.call
+        return self.call
+
+    def __exit__(self, *exc_info) -> None:
+        _local.call = self._previous
+
+
+class stage:
+    """ Context manager adding the time spent in it to a stage of the current call. """
+
+    def __init__(self, name: str, exclude: str = None):
+        """
+        :param name: Name of the stage.
+        :param exclude: Stage whose time added meanwhile is not counted (e.g. "connect" within "wait").
+        """
+
+        self.name = name
+        self.exclude = exclude
+
+    def __enter__(self) -> None:
+        self._call = current()
+        if self._call is not None:
+            self._excluded = self._call.stages[self.exclude] if self.exclude is not None else 0.0
+            self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        if self._call is not None:
+            seconds = time.perf_counter() - self._start
+            if self.exclude is not None:
+                seconds -= self._call.stages[self.exclude] - self._excluded
+
+            self._call.add(self.name, max(0.0, seconds))
+
+
+class call:
+    """
+    Context manager profiling a call with a profiler. Within a call that is already profiled by the thread (e.g. the
+    request of a scraper), the stages are added to the outer call.
+    """
+
+    def __init__(self, profiler: Optional[Profiler], name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> Optional[Call]:
+        self._call = None
+        if self.profiler is None or current() is not None:
+            return current()
+
+        self._call = Call(self.name)
+
+        self._cprofile = None
+        if self.profiler.profile_threshold is not None and _cprofile_lock.acquire(blocking=False):
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError:
+                # another profiling tool is active
+                self._cprofile = None
+                _cprofile_lock.release()
+
+        self._activation = activate(self._call)
+        self._activation.__enter__()
+
+        self._start = time.perf_counter()
+
+        return self._call
+
+    def __exit__(self, *exc_info) -> None:
+        if self._call is None:
+            return
+
+        self._call.duration = time.perf_counter() - self._start
+        self._activation.__exit__(*exc_info)
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            _cprofile_lock.release()
+
+            if self._call.duration >= self.profiler.profile_threshold:
+                self._call.profile = _statistics(self._cprofile)
+
+        self.profiler.record(self._call)
+
+
+def profiled(name: str):
+    """
+    Decorator profiling a TMDbClient method with the profiler of the client.
+
+    :param name: Name of the call.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            if self.profiler is None:
+                return function(self, *args, **kwargs)
+
+            with call(self.profiler, name):
+                return function(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _statistics(profile, limit: int = 30) -> str:
+    import io
+    import pstats
+
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(limit)
+
+    return stream.getvalue()
+
+
+_adapter_class = None
+
+
+def adapter() -> "requests.adapters.HTTPAdapter":
+    """
+    Returns a transport adapter for requests sessions that adds the time spent establishing connections to the
+    "connect" stage of the current call.
+
+    :return: Transport adapter.
+    """
+
+    global _adapter_class
+
+    if _adapter_class is None:
+        import requests.adapters
+
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        class TimedHTTPConnection(HTTPConnection):
+            def connect(self):
+                with stage("connect"):
+                    super().connect()
+
+        class TimedHTTPSConnection(HTTPSConnection):
+            def connect(self):
+                with stage("connect"):
+                    super().connect()
+
+        class TimedHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = TimedHTTPConnection
+
+        class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = TimedHTTPSConnection
+
+        class TimedHTTPAdapter(requests.adapters.HTTPAdapter):
+            def init_poolmanager(self, *args, **kwargs):
+                super().init_poolmanager(*args, **kwargs)
+                self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool,
+                                                           "https": TimedHTTPSConnectionPool}
+
+        _adapter_class = TimedHTTPAdapter
+
+    return _adapter_class()
@@ -0,0 +1,257 @@
+"""
+Record/replay transport for deterministic offline runs. A Recorder writes every response (status, headers and body)
+of a client to an archive file, a Replayer serves the responses from the archive without network access:
+
+    import tmdb
+
+    from tmdb import replay
+
+    # record the responses of a run
+    with tmdb.TMDbClient(transport=replay.Recorder("tmdb.archive")) as client:
+        client.search(query="Star Wars")
+
+    # replay them (e.g. in tests, load tests or CI performance gates), optionally with a latency per response
+    tmdb.set_default_client(tmdb.TMDbClient(transport=replay.Replayer("tmdb.archive", latency=0.05)))
+    tmdb.API.search(query="Star Wars")
+
+Responses are keyed by URL path and query (prefixed by the method for requests other than GET), so an archive can
+be replayed against any base URL. The archive is a sequence of records (header, JSON metadata, body); an index from
+keys to record offsets is built when it is opened, so every lookup is a dictionary access and a single read.
+"""
+
+import io
+import json
+import os
+import struct
+import threading
+import time
+
+from typing import TYPE_CHECKING, Callable, Union
+
+if TYPE_CHECKING:
+    import requests
+
+# file signature and record header (length of the metadata, length of the body)
+MAGIC = b"TMDBARC1"
+HEADER = struct.Struct(">II")
+
+# bodies above this size (in bytes) are compressed if that makes them smaller
+COMPRESSION_THRESHOLD = 512
+
+
+class ReplayMissError(LookupError):
+    """ Raised by a Replayer for a request that is not in the archive. """
+
+
+class Archive:
+    """ Thread-safe append-only file of recorded responses with an in-memory index. """
+
+    def __init__(self, path: str, read_only: bool = False):
+        """
+        :param path: Path of the archive file (created if it does not exist, unless opened read-only).
+        :param read_only: Open the archive for reading only (e.g. archives checked in as read-only test fixtures).
+        """
+
+        self.path = path
+        self.read_only = read_only
+        self._index = {}
+        self._lock = threading.Lock()
+
+        self._file = open(path, "rb" if read_only else "a+b")
+        self._file.seek(0)
+
+        if self._file.read(len(MAGIC)) not in (MAGIC, b""):
+            self._file.close()
+            raise ValueError(f"{path} is not a response archive.")
+
+        self._build_index()
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def _build_index(self) -> None:
+        # reads the record headers and metadata, the bodies are skipped
+        size = self._file.seek(0, os.SEEK_END)
+        offset = 0 if size == 0 else len(MAGIC)
+
+        while offset + HEADER.size <= size:
+            self._file.seek(offset)
+            meta_length, body_length = HEADER.unpack(self._file.read(HEADER.size))
+
+            end = offset + HEADER.size + meta_length + body_length
+            if end > size:
+                # incomplete last record (e.g. the recording process was killed)
+                break
+
+            meta = json.loads(self._file.read(meta_length))
+            self._index[meta["key"]] = (offset + HEADER.size, meta_length, body_length)
+            offset = end
+
+        self._end = offset
+
+    def write(self, key: str, status_code: int, headers: dict, body: bytes, encoding: str = None) -> None:
+        """
+        Appends a response to the archive. A later response for the same key replaces the earlier one.
+
+        :param key: URL path and query.
+        :param status_code: HTTP status code.
+        :param headers: Response headers.
+        :param body: Response body.
+        :param encoding: Text encoding of the body.
+        """
+
+        if self.read_only:
+            raise ValueError(f"Response archive {self.path} was opened read-only.")
+
+        compressed = False
+        if len(body) > COMPRESSION_THRESHOLD:
+            import zlib
+
+            data = zlib.compress(body)
+            if len(data) < len(body):
+                body, compressed = data, True
+
+        meta = json.dumps({"key": key, "status": status_code, "headers": headers, "encoding": encoding,
+                           "compressed": compressed}, separators=(",", ":")).encode("utf-8")
+
+        with self._lock:
+            # drop the incomplete record of an interrupted recording
+            self._file.truncate(self._end)
+            self._file.seek(self._end)
+
+            if self._end == 0:
+                self._file.write(MAGIC)
+                self._end = len(MAGIC)
+
+            self._file.write(HEADER.pack(len(meta), len(body)) + meta + body)
+            self._file.flush()
+
+            self._index[key] = (self._end + HEADER.size, len(meta), len(body))
+            self._end += HEADER.size + len(meta) + len(body)
+
+    def read(self, key: str) -> dict:
+        """
+        Reads a response from the archive.
+
+        :param key: URL path and query.
+        :return: Dictionary with "status", "headers", "encoding" and "body".
+        """
+
+        offset, meta_length, body_length = self._index[key]
+
+        with self._lock:
+            self._file.seek(offset)
+            data = self._file.read(meta_length + body_length)
+
+        meta = json.loads(data[:meta_length])
+        body = data[meta_length:]
+
+        if meta["compressed"]:
+            import zlib
+
+            body = zlib.decompress(body)
+
+        return {"status": meta["status"], "headers": meta["headers"], "encoding": meta["encoding"], "body": body}
+
+
+class Recorder:
+    """ Transport sending requests to TMDb and writing the responses to an archive. """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the archive file (responses are appended).
+        """
+
+        self.archive = Archive(path)
+
+    def close(self) -> None:
+        self.archive.close()
+
+    def fetch(self, key: str, send: Callable) -> "requests.Response":
+        """
+        Sends a request and records its response.
+
+        :param key: URL path and query.
+        :param send: Function sending the request.
+        :return: Response.
+        """
+
+        response = send()
+
+        # the body is read completely (also for streamed responses) and decoded, so it can be recorded
+        body = response.content
+
+        # the recorded body is decoded and complete, the headers must describe it (the Content-Length of a HEAD
+        # response describes the body of the GET response and is kept)
+        head = getattr(response.request, "method", "GET") == "HEAD"
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() not in ("content-encoding", "transfer-encoding")
+                   and (head or name.lower() != "content-length")}
+        if not head:
+            headers["Content-Length"] = str(len(body))
+
+        self.archive.write(key, status_code=response.status_code, headers=headers, body=body,
+                           encoding=response.encoding)
+
+        return response
+
+
+class Replayer:
+    """ Transport serving responses from an archive without network access. """
+
+    def __init__(self, path: str, latency: Union[float, Callable] = 0.0):
+        """
+        :param path: Path of the archive file.
+        :param latency: Seconds to wait before answering, or a function returning them for a key.
+        """
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Response archive {path} does not exist.")
+
+        self.archive = Archive(path, read_only=True)
+        self.latency = latency
+
+    def close(self) -> None:
+        self.archive.close()
+
+    def fetch(self, key: str, send: Callable = None) -> "requests.Response":
+        """
+        Returns the recorded response for a request.
+
+        :param key: URL path and query.
+        :param send: Ignored, no request is sent.
+        :return: Response.
+        """
+
+        import requests
+
+        if key not in self.archive:
+            raise ReplayMissError(f"No response for {key} was recorded.")
+
+        record = self.archive.read(key)
+
+        latency = self.latency(key) if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.headers.update(record["headers"])
+        response.encoding = record["encoding"]
+        response._content = record["body"]
+        response.raw = io.BytesIO(record["body"])
+
+        return response
@@ -0,0 +1,285 @@
+"""
+Tail-latency control for requests to TMDb: hedged requests, per-endpoint circuit breakers and rate limiting.
+
+    import tmdb
+
+    client = tmdb.TMDbClient(
+        # send a second request if the first one takes longer than the 95th latency percentile of the endpoint
+        hedging=tmdb.resilience.Hedging(percentile=95),
+        # fail fast after 5 consecutive failures of an endpoint, try again after 30 seconds
+        circuit_breakers=tmdb.resilience.CircuitBreakers(failure_threshold=5, recovery_time=30),
+    )
+"""
+
+import re
+import threading
+import time
+
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import concurrent.futures
+
+
+class CircuitOpenError(Exception):
+    """ Raised instead of sending a request while the circuit breaker of an endpoint is open. """
+
+
+def endpoint(path: str) -> str:
+    """
+    Returns the endpoint of a URL path, i.e. the path with ids replaced (e.g. "/tv/{id}/season/{id}").
+
+    :param path: URL path.
+    :return: Endpoint.
+    """
+
+    if path.startswith("/t/p/"):
+        return "/t/p"
+
+    return re.sub(r"/\d+[^/]*", "/{id}", path) or "/"
+
+
+class LatencyTracker:
+    """ Thread-safe sliding window of response times. """
+
+    def __init__(self, window: int = 200):
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Returns a percentile of the recorded response times (nearest rank).
+
+        :param percentile: Percentile between 0 and 100.
+        :return: Response time in seconds.
+        """
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if not latencies:
+            raise ValueError("No response times recorded.")
+
+        rank = max(0, min(len(latencies) - 1, round(percentile / 100 * len(latencies)) - 1))
+
+        return latencies[rank]
+
+
+class Hedging:
+    """
+    Policy for hedged requests: if a request has not been answered after the given latency percentile of its
+    endpoint, a duplicate request is sent and the first answer is used.
+    """
+
+    def __init__(self, percentile: float = 95, min_samples: int = 20, default_delay: float = 1.0,
+                 min_delay: float = 0.01, window: int = 200):
+        """
+        :param percentile: Latency percentile after which the duplicate request is sent.
+        :param min_samples: Number of response times needed before the percentile is used.
+        :param default_delay: Delay in seconds used until enough response times were recorded.
+        :param min_delay: Lower bound for the delay in seconds.
+        :param window: Number of response times per endpoint the percentile is computed from.
+        """
+
+        if not 0 < percentile <= 100:
+            raise ValueError("Hedging percentile must be between 0 and 100.")
+
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.window = window
+        self._trackers = {}
+        self._lock = threading.Lock()
+
+    def tracker(self, endpoint_name: str) -> LatencyTracker:
+        with self._lock:
+            if endpoint_name not in self._trackers:
+                self._trackers[endpoint_name] = LatencyTracker(window=self.window)
+
+            return self._trackers[endpoint_name]
+
+    def delay(self, endpoint_name: str) -> float:
+        """
+        Returns the time to wait for an answer before sending the duplicate request.
+
+        :param endpoint_name: Endpoint.
+        :return: Delay in seconds.
+        """
+
+        tracker = self.tracker(endpoint_name)
+        if len(tracker) < self.min_samples:
+            return self.default_delay
+
+        return max(self.min_delay, tracker.percentile(self.percentile))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of a single endpoint. After failure_threshold consecutive failures the circuit opens and requests
+    fail fast. After recovery_time seconds a single trial request is let through (half-open), which closes the circuit
+    on success and opens it again on failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_time: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.failures = 0
+        self._opened = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened is None:
+            return self.CLOSED
+
+        if time.monotonic() - self._opened >= self.recovery_time:
+            return self.HALF_OPEN
+
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """
+        Returns whether a request may be sent.
+
+        :return: Request allowed.
+        """
+
+        with self._lock:
+            match self._state():
+                case self.CLOSED:
+                    return True
+                case self.HALF_OPEN if not self._trial:
+                    self._trial = True
+                    return True
+                case _:
+                    return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+
+            if self._opened is not None or self.failures >= self.failure_threshold:
+                self._opened = time.monotonic()
+
+
+class RateLimiter:
+    """ Thread-safe token bucket limiting the number of requests per second. """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        :param rate: Requests per second.
+        :param burst: Number of requests that may be sent at once after a pause.
+        """
+
+        if rate <= 0:
+            raise ValueError("RateLimiter rate must be greater than 0.")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """ Blocks until a request may be sent. """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # reserve a token; a negative balance is the time the caller has to wait
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait:
+            time.sleep(wait)
+
+
+class CircuitBreakers:
+    """ Registry creating one CircuitBreaker per endpoint. """
+
+    def __init__(self, failure_threshold: int = 5, recovery_time: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, endpoint_name: str) -> CircuitBreaker:
+        with self._lock:
+            if endpoint_name not in self._breakers:
+                self._breakers[endpoint_name] = CircuitBreaker(failure_threshold=self.failure_threshold,
+                                                               recovery_time=self.recovery_time)
+
+            return self._breakers[endpoint_name]
+
+    def states(self) -> dict:
+        """
+        Returns the state of every endpoint's circuit breaker.
+
+        :return: Dictionary mapping endpoints to states.
+        """
+
+        with self._lock:
+            breakers = dict(self._breakers)
+
+        return {endpoint_name: breaker.state for endpoint_name, breaker in breakers.items()}
+
+
+def hedged(function, delay: float, executor: "concurrent.futures.Executor"):
+    """
+    Calls a function and, if it has not returned after the delay, calls it a second time concurrently. Returns the
+    first successful result or raises the exception of the last failed call.
+
+    :param function: Function without parameters.
+    :param delay: Delay in seconds before the second call.
+    :param executor: Executor running the calls.
+    :return: Result of the function.
+    """
+
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    pending = {executor.submit(function)}
+    done, pending = wait(pending, timeout=delay)
+
+    # the first request did not answer in time, send the duplicate
+    if not done:
+        pending.add(executor.submit(function))
+
+    error = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+
+            error = future.exception()
+
+        if not pending:
+            raise error
+
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
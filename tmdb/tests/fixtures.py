@@ -0,0 +1,161 @@
+"""
+Helpers for building offline TMDb responses in tests. The markup mirrors the parts of the TMDb pages the library reads.
+"""
+
+import http.server
+import io
+import threading
+import time
+
+import requests
+
+
+def response(body, status_code: int = 200, headers: dict = None) -> requests.Response:
+    """
+    Builds a requests.Response with the given body.
+
+    :param body: Response body as string or bytes.
+    :param status_code: HTTP status code.
+    :param headers: Response headers.
+    :return: Response.
+    """
+
+    http_response = requests.Response()
+    http_response.status_code = status_code
+    http_response._content = body.encode("utf-8") if isinstance(body, str) else body
+    http_response.raw = io.BytesIO(http_response._content)
+    http_response.encoding = "utf-8"
+    http_response.headers.update(headers or {})
+
+    return http_response
+
+
+def search_card(category: str, tmdb_id: str, title: str, release_date: str = None, description: str = None,
+                poster_id: str = None) -> str:
+    """ Returns the markup of a single search result card. """
+
+    image = ""
+    if poster_id is not None:
+        image = (f'<div class="image"><a href="/{category}/{tmdb_id}">'
+                 f'<img loading="lazy" class="poster" '
+                 f'src="https://media.themoviedb.org/t/p/w94_and_h141_bestv2/{poster_id}.jpg" '
+                 f'srcset="https://media.themoviedb.org/t/p/w94_and_h141_bestv2/{poster_id}.jpg 1x, '
+                 f'https://media.themoviedb.org/t/p/w188_and_h282_bestv2/{poster_id}.jpg 2x"></a></div>')
+
+    release = "" if release_date is None else f'<span class="release_date">{release_date}</span>'
+    overview = "" if description is None else f'<div class="overview"><p>{description}</p></div>'
+
+    return (f'<div class="card v4 tight">{image}<div class="details"><div class="wrapper"><div class="title">'
+            f'<a data-id="{tmdb_id}" data-media-type="{category}" href="/{category}/{tmdb_id}"><h2>{title}</h2></a>'
+            f'{release}</div></div>{overview}</div></div>')
+
+
+def search_page(cards: list, next_page: bool = False) -> str:
+    """ Returns the markup of a search result page. """
+
+    pagination = '<span class="page next"><a href="#">Next</a></span>' if next_page else ""
+
+    return f'<html><body><section class="search_results">{"".join(cards)}</section>{pagination}</body></html>'
+
+
+def seasons_page(series_id: str, season_numbers: list) -> str:
+    """ Returns the markup of the seasons page of a TV series. """
+
+    seasons = "".join(f'<div class="season_wrapper"><h2><a href="/tv/{series_id}/season/{number}">Season {number}</a>'
+                      f'</h2></div>' for number in season_numbers)
+
+    return f"<html><body>{seasons}</body></html>"
+
+
+def season_page(episodes: list) -> str:
+    """ Returns the markup of a season page. Episodes are given as (number, title) tuples. """
+
+    cards = "".join(f'<div class="card"><span class="episode_number">{number}</span>'
+                    f'<div class="episode_title"><a href="#">{title}</a></div></div>' for number, title in episodes)
+
+    return f"<html><body>{cards}</body></html>"
+
+
+def listing_card(category: str, tmdb_id: str, title: str, release_date: str = None, poster_id: str = None) -> str:
+    """ Returns the markup of a card of the popular and trending listings. """
+
+    image = ""
+    if poster_id is not None:
+        image = (f'<div class="image"><a class="image" href="/{category}/{tmdb_id}-slug" title="{title}">'
+                 f'<img loading="lazy" class="poster" '
+                 f'src="https://media.themoviedb.org/t/p/w220_and_h330_face/{poster_id}.jpg"></a></div>')
+
+    release = "" if release_date is None else f"<p>{release_date}</p>"
+
+    return (f'<div class="card style_1">{image}<div class="content">'
+            f'<h2><a href="/{category}/{tmdb_id}-slug" title="{title}">{title}</a></h2>{release}</div></div>')
+
+
+def listing_page(cards: list) -> str:
+    """ Returns the markup of a popular or trending listing. """
+
+    return f'<html><body><div class="page_wrapper">{"".join(cards)}</div></body></html>'
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """
+    Local stand-in for TMDb. Routes map URL paths to functions returning (status code, body) or to a
+    (status code, body) tuple. A route may be given a delay in seconds, applied before answering.
+
+        server = StubServer({"/search": (200, "<html></html>")}).start()
+        client = TMDbClient(base_url=server.url)
+    """
+
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(self, routes: dict = None):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.routes = dict(routes or {})
+        self.delays = {}
+        self.requests = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head: bool = False):
+        path = self.path.split("?")[0]
+
+        with self.server._lock:
+            self.server.requests.append(self.path)
+            count = sum(1 for request in self.server.requests if request.split("?")[0] == path)
+
+        route = self.server.routes.get(path, (404, "Not Found"))
+        status_code, body = route(count) if callable(route) else route
+
+        delay = self.server.delays.get(path, 0)
+        time.sleep(delay(count) if callable(delay) else delay)
+
+        body = body.encode("utf-8") if isinstance(body, str) else body
+        try:
+            self.send_response(status_code)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+        except OSError:
+            # the client gave up (timeout or hedged request answered first)
+            pass
+
+    def log_message(self, format, *args):
+        pass
@@ -1,10 +1,21 @@
 import unittest
 
+from unittest import mock
+
 from .. import *
+from . import fixtures
 
 
 class TestTMDbAPI(unittest.TestCase):
 
+    def setUp(self):
+        # a dedicated default client, so that cached results of other tests are never returned
+        self.addCleanup(set_default_client, default_client())
+
+        client = TMDbClient(cache=caching.MemoryCache())
+        self.addCleanup(client.close)
+        set_default_client(client)
+
     # tests for languages()
     def test_languages_iso_639(self):
         """ Check whether language tags match the ISO-639-1 standard."""
@@ -135,6 +146,201 @@ class TestTMDbAPI(unittest.TestCase):
 
         self.assertRaises(ValueError, lambda: API.poster_path(poster_id=poster_id, width=width, height=height))
 
+    # tests for search_multilang()
+    def test_search_multilang(self):
+        pages = {
+            "en": fixtures.search_page([
+                fixtures.search_card("movie", "11", "Star Wars", "May 25, 1977", "A long time ago.", "poster11"),
+                fixtures.search_card("tv", "4194", "Star Wars: The Clone Wars", "October 3, 2008", None, "p4194")]),
+            "de": fixtures.search_page([
+                fixtures.search_card("movie", "11", "Krieg der Sterne", "25. Mai 1977", "Vor langer Zeit.", "poster11")]),
+        }
+
+        def get(path="", query="", stream=False):
+            language = re.search(r"language=(\w+)", query).group(1)
+            return fixtures.response(pages[language])
+
+        with mock.patch.object(TMDbClient, "get", side_effect=get) as request_get:
+            records = API.search_multilang(query="multilang star wars", languages=["en", "de", "en"])
+
+        self.assertEqual(2, request_get.call_count)
+        self.assertEqual(2, len(records))
+
+        star_wars = records[0]
+        self.assertEqual(("movie", "11", "1977"),
+                         (star_wars["category"], star_wars["tmdb_id"], star_wars["release_year"]))
+        self.assertEqual({"en": "Star Wars", "de": "Krieg der Sterne"}, star_wars["titles"])
+        self.assertEqual({"en": "A long time ago.", "de": "Vor langer Zeit."}, star_wars["descriptions"])
+        self.assertIs(star_wars["poster_ids"]["en"], star_wars["poster_ids"]["de"])
+
+        clone_wars = records[1]
+        self.assertEqual({"en": "Star Wars: The Clone Wars"}, clone_wars["titles"])
+        self.assertEqual({}, clone_wars["descriptions"])
+
+    def test_search_multilang_category_year_fields(self):
+        page = fixtures.search_page([
+            fixtures.search_card("movie", "11", "Star Wars", "May 25, 1977", "A long time ago.", "poster11"),
+            fixtures.search_card("movie", "12", "Star Wars II", "1980", "Later.", "poster12")])
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)) as request_get:
+            records = API.search_multilang(query="multilang options star wars", languages=["en", "de"],
+                                           category="movie", year=1977, fields=("category", "tmdb_id", "title"))
+
+        self.assertEqual({"/search/movie"}, {call.kwargs["path"] for call in request_get.call_args_list})
+        self.assertEqual([{"category": "movie", "tmdb_id": "11", "release_year": None,
+                           "titles": {"en": "Star Wars", "de": "Star Wars"}, "descriptions": {}, "poster_ids": {}}],
+                         records)
+
+    def test_search_multilang_fields_without_ids(self):
+        page = fixtures.search_page([fixtures.search_card("tv", "1399", "GoT"),
+                                     fixtures.search_card("movie", "11", "Star Wars")])
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)):
+            records = API.search_multilang(query="multilang title only", languages=["en", "de"], fields=("title",))
+
+        # the records are not merged into one without category and tmdb_id
+        self.assertEqual([("tv", "1399", {"en": "GoT", "de": "GoT"}),
+                          ("movie", "11", {"en": "Star Wars", "de": "Star Wars"})],
+                         [(record["category"], record["tmdb_id"], record["titles"]) for record in records])
+
+    def test_search_multilang_no_languages(self):
+        self.assertEqual([], API.search_multilang(query="Star Wars", languages=[]))
+
+    def test_poster_path_width(self):
+        poster_id = "mqGTDn6c5wy4Bwf6DR7eZeO7c5d"
+
+        self.assertEqual(f"/t/p/w342/{poster_id}.jpg", API.poster_path(poster_id=poster_id, width=342))
+        self.assertRaises(ValueError, lambda: API.poster_path(poster_id=poster_id, width=94))
+
+    # tests for poster_size()
+    def test_poster_size(self):
+        self.assertEqual((92, None), API.poster_size(max_width=50))
+        self.assertEqual((185, None), API.poster_size(max_width=160))
+        self.assertEqual((188, 282), API.poster_size(max_width=186))
+        self.assertEqual((300, 450), API.poster_size(max_width=200, max_height=400))
+        self.assertEqual((780, None), API.poster_size(max_height=1000))
+        self.assertIsNone(API.poster_size(max_width=2000))
+
+    def test_poster_size_preferred(self):
+        card_variants = ("w94_and_h141_bestv2", "w188_and_h282_bestv2")
+
+        # card variants that are barely larger than the smallest size are used
+        self.assertEqual((92, None), API.poster_size(max_width=90))
+        self.assertEqual((94, 141), API.poster_size(max_width=90, preferred=card_variants))
+        self.assertEqual((185, None), API.poster_size(max_width=180))
+        self.assertEqual((188, 282), API.poster_size(max_width=180, preferred=card_variants))
+
+        # card variants much larger than the smallest size are not
+        self.assertEqual((154, None), API.poster_size(max_width=152, preferred=card_variants))
+        self.assertEqual((92, None), API.poster_size(max_width=90, preferred=("w188_and_h282_bestv2",)))
+        self.assertEqual((92, None), API.poster_size(max_width=90, preferred=card_variants, tolerance=1.0))
+
+        # variants that do not cover the box are not
+        self.assertEqual((300, 450), API.poster_size(max_width=200, preferred=card_variants))
+
+    # tests for posters()
+    def test_posters(self):
+        tmdb_entries = [TMDbEntry(poster_id="poster1"), TMDbEntry(), TMDbEntry(poster_id="poster2")]
+
+        def get(path="", query="", stream=False, headers=None):
+            return fixtures.response(path.encode("utf-8"))
+
+        # only the headers of the original images are requested
+        with mock.patch.object(TMDbClient, "get", side_effect=get), \
+                mock.patch.object(TMDbClient, "head", return_value=fixtures.response(
+                    b"", headers={"Content-Length": "1000"})) as request_head:
+            images, statistics = API.posters(tmdb_entries, max_width=200, measure_savings=True)
+
+        self.assertEqual(["/t/p/original/poster1.jpg", "/t/p/original/poster2.jpg"],
+                         sorted(call.kwargs["path"] for call in request_head.call_args_list))
+
+        self.assertEqual(b"/t/p/w300_and_h450_bestv2/poster1.jpg", images[0].getvalue())
+        self.assertIsNone(images[1])
+        self.assertEqual(2, statistics["posters"])
+        self.assertEqual(2 * len(b"/t/p/w300_and_h450_bestv2/poster1.jpg"), statistics["bytes"])
+        self.assertEqual(2000, statistics["bytes_original"])
+        self.assertEqual(2000 - statistics["bytes"], statistics["bytes_saved"])
+
+    def test_search_poster_variants(self):
+        page = fixtures.search_page([fixtures.search_card("movie", "11", "Star Wars", poster_id="poster11")])
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)):
+            search_results = API.search(query="poster variants star wars")
+
+        self.assertEqual(("w94_and_h141_bestv2", "w188_and_h282_bestv2"), search_results[0].poster_variants)
+
+    def test_search_category(self):
+        page = fixtures.search_page([fixtures.search_card("movie", "11", "Star Wars", release_date="1977"),
+                                     fixtures.search_card("movie", "12", "Star Wars II", release_date="1980")])
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)) as request_get:
+            search_results = API.search(query="category star wars", category="movie")
+
+        self.assertEqual("/search/movie", request_get.call_args.kwargs["path"])
+        self.assertEqual([TMDbEntry(category="movie", tmdb_id="11"), TMDbEntry(category="movie", tmdb_id="12")],
+                         search_results)
+
+    def test_search_category_filters_cards(self):
+        page = fixtures.search_page([fixtures.search_card("tv", "1", "Star Wars: Andor"),
+                                     fixtures.search_card("movie", "11", "Star Wars")])
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)):
+            search_results = API.search(query="category filter star wars", category="tv")
+
+        self.assertEqual([TMDbEntry(category="tv", tmdb_id="1")], search_results)
+
+    def test_search_year(self):
+        page = fixtures.search_page([fixtures.search_card("movie", "11", "Star Wars", release_date="May 25, 1977"),
+                                     fixtures.search_card("movie", "12", "Star Wars II", release_date="1980"),
+                                     fixtures.search_card("movie", "13", "Star Wars III")])
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)):
+            search_results = API.search(query="year star wars", category="movie", year=1977)
+
+        self.assertEqual([TMDbEntry(category="movie", tmdb_id="11")], search_results)
+        self.assertEqual("1977", search_results[0].release_year)
+
+    def test_search_fields(self):
+        page = fixtures.search_page([fixtures.search_card("movie", "11", "Star Wars", release_date="1977",
+                                                          description="A long time ago...", poster_id="poster11")])
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)):
+            search_results = API.search(query="fields star wars", fields=("title", "tmdb_id", "category"))
+
+        tmdb_entry = search_results[0]
+        self.assertEqual(("movie", "11", "Star Wars"), (tmdb_entry.category, tmdb_entry.tmdb_id, tmdb_entry.title))
+        self.assertEqual((None, None, None, ()), (tmdb_entry.release_year, tmdb_entry.description,
+                                                  tmdb_entry.poster_id, tmdb_entry.poster_variants))
+
+    def test_search_fields_with_year_filter(self):
+        page = fixtures.search_page([fixtures.search_card("movie", "11", "Star Wars", release_date="1977"),
+                                     fixtures.search_card("movie", "12", "Star Wars II", release_date="1980")])
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)):
+            search_results = API.search(query="fields year star wars", year=1980, fields=("tmdb_id",))
+
+        self.assertEqual(["12"], [tmdb_entry.tmdb_id for tmdb_entry in search_results])
+        self.assertIsNone(search_results[0].release_year)
+
+    def test_search_fields_share_cache_keys(self):
+        page = fixtures.search_page([fixtures.search_card("movie", "11", "Star Wars")])
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)) as request_get:
+            API.search(query="fields cache star wars", fields=("tmdb_id", "title"))
+            API.search(query="fields cache star wars", fields=["title", "tmdb_id"])
+
+        self.assertEqual(1, request_get.call_count)
+
+    def test_search_invalid_fields(self):
+        self.assertRaises(ValueError, lambda: API.search(query="star wars", fields=("rating",)))
+        self.assertRaises(ValueError, lambda: API.search(query="star wars", fields="title"))
+
+    def test_search_invalid_category(self):
+        self.assertRaises(ValueError, lambda: API.search(query="star wars", category="person"))
+
+    def test_search_invalid_year(self):
+        self.assertRaises(ValueError, lambda: API.search(query="star wars", year=77))
+
     # tests for TV.number_of_seasons()
     def test_number_of_seasons(self):
         self.assertEqual(3, API.TV.number_of_seasons(series_id="253"))
@@ -0,0 +1,257 @@
+import fnmatch
+import os
+import socketserver
+import tempfile
+import threading
+import unittest
+
+from unittest import mock
+
+from .. import *
+from .. import __version__, caching
+from . import fixtures
+
+
+class MemcachedHandler(socketserver.StreamRequestHandler):
+    """ Minimal memcached text protocol server (get, mg, set, delete). """
+
+    def handle(self):
+        store = self.server.store
+
+        for line in self.rfile:
+            command = line.split()
+            if not command:
+                continue
+
+            match command[0]:
+                case b"get":
+                    if command[1] in store:
+                        value = store[command[1]]
+                        self.wfile.write(b"VALUE %s 0 %d\r\n%s\r\n" % (command[1], len(value), value))
+                    self.wfile.write(b"END\r\n")
+                case b"mg":
+                    self.wfile.write(b"HD\r\n" if command[1] in store else b"EN\r\n")
+                case b"set":
+                    store[command[1]] = self.rfile.read(int(command[4]) + 2)[:-2]
+                    self.wfile.write(b"STORED\r\n")
+                case b"delete":
+                    self.wfile.write(b"DELETED\r\n" if store.pop(command[1], None) is not None else b"NOT_FOUND\r\n")
+
+
+class RedisHandler(socketserver.StreamRequestHandler):
+    """ Minimal Redis protocol server (GET, EXISTS, SET, DEL, SCAN with pages of two keys). """
+
+    def handle(self):
+        store = self.server.store
+
+        for line in self.rfile:
+            arguments = []
+            for _ in range(int(line[1:])):
+                size = int(self.rfile.readline()[1:])
+                arguments.append(self.rfile.read(size + 2)[:-2])
+
+            match arguments[0]:
+                case b"GET":
+                    value = store.get(arguments[1])
+                    self.wfile.write(b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value))
+                case b"EXISTS":
+                    self.wfile.write(b":%d\r\n" % int(arguments[1] in store))
+                case b"SET":
+                    store[arguments[1]] = arguments[2]
+                    self.wfile.write(b"+OK\r\n")
+                case b"DEL":
+                    self.wfile.write(b":%d\r\n" % sum(store.pop(key, None) is not None for key in arguments[1:]))
+                case b"SCAN":
+                    # cursors index the keys matching when the scan started, like Redis they survive deletions
+                    cursor = int(arguments[1])
+                    if cursor == 0:
+                        pattern = arguments[arguments.index(b"MATCH") + 1].decode("utf-8")
+                        self.scan = sorted(key for key in store if fnmatch.fnmatchcase(key.decode("utf-8"), pattern))
+                    page, cursor = self.scan[cursor:cursor + 2], cursor + 2 if cursor + 2 < len(self.scan) else 0
+                    self.wfile.write(b"*2\r\n$%d\r\n%d\r\n*%d\r\n" % (len(str(cursor)), cursor, len(page)) +
+                                     b"".join(b"$%d\r\n%s\r\n" % (len(key), key) for key in page))
+
+
+def start_server(handler) -> socketserver.ThreadingTCPServer:
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.store = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+class TestCaching(unittest.TestCase):
+
+    def assertBackend(self, backend):
+        self.assertIsNone(backend.get("tmdb:key"))
+        self.assertFalse(backend.exists("tmdb:key"))
+
+        backend.set("tmdb:key", b"value\r\nwith line break")
+        self.assertEqual(b"value\r\nwith line break", backend.get("tmdb:key"))
+        self.assertTrue(backend.exists("tmdb:key"))
+
+        backend.delete("tmdb:key")
+        self.assertIsNone(backend.get("tmdb:key"))
+        self.assertFalse(backend.exists("tmdb:key"))
+
+    # tests for the backends
+    def test_memory_cache(self):
+        self.assertBackend(caching.MemoryCache())
+
+    def test_memory_cache_lru(self):
+        backend = caching.MemoryCache(max_entries=2)
+        backend.set("a", b"1")
+        backend.set("b", b"2")
+        backend.get("a")
+        backend.set("c", b"3")
+
+        self.assertEqual(b"1", backend.get("a"))
+        self.assertIsNone(backend.get("b"))
+
+    def test_memory_cache_ttl(self):
+        backend = caching.MemoryCache()
+        backend.set("a", b"1", ttl=-1)
+
+        self.assertFalse(backend.exists("a"))
+        self.assertIsNone(backend.get("a"))
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertBackend(caching.DiskCache(directory))
+
+            backend = caching.DiskCache(directory)
+            backend.set("a", b"1")
+            self.assertEqual(b"1", caching.DiskCache(directory).get("a"))
+
+            backend.set("b", b"2", ttl=-1)
+            self.assertFalse(backend.exists("b"))
+
+            # files of others in the directory are kept
+            other_files = [os.path.join(directory, "notes.txt"), os.path.join(directory, "ab", "other.txt")]
+            os.makedirs(os.path.join(directory, "ab"), exist_ok=True)
+            for path in other_files:
+                with open(path, "w") as file:
+                    file.write("other")
+
+            backend.clear()
+            self.assertIsNone(backend.get("a"))
+            self.assertEqual(["ab", "notes.txt"], sorted(os.listdir(directory)))
+            self.assertEqual(["other.txt"], os.listdir(os.path.join(directory, "ab")))
+
+    def test_memcached_cache(self):
+        server = start_server(MemcachedHandler)
+        self.addCleanup(server.shutdown)
+
+        backend = caching.MemcachedCache(port=server.server_address[1])
+        self.addCleanup(backend.close)
+
+        self.assertBackend(backend)
+
+        # flush_all would remove the keys of other applications
+        backend.set("other:a", b"1")
+        self.assertRaises(NotImplementedError, backend.clear)
+        self.assertEqual(b"1", backend.get("other:a"))
+
+    def test_redis_cache(self):
+        server = start_server(RedisHandler)
+        self.addCleanup(server.shutdown)
+
+        backend = caching.RedisCache(port=server.server_address[1])
+        self.addCleanup(backend.close)
+
+        self.assertBackend(backend)
+
+    def test_redis_cache_clear(self):
+        server = start_server(RedisHandler)
+        self.addCleanup(server.shutdown)
+
+        backend = caching.RedisCache(port=server.server_address[1])
+        self.addCleanup(backend.close)
+
+        # keys of other applications on the same server are kept
+        for key in ["tmdb:a", "tmdb:b", "tmdb:c", "tmdb:d:stale", "tmdb:e", "other:a"]:
+            backend.set(key, b"1")
+
+        backend.clear()
+
+        self.assertEqual([b"other:a"], list(server.store))
+        self.assertEqual(b"1", backend.get("other:a"))
+
+    def test_network_cache_unavailable(self):
+        """ An unreachable cache server is treated as a cache miss. """
+
+        server = start_server(RedisHandler)
+        port = server.server_address[1]
+        server.shutdown()
+        server.server_close()
+
+        backend = caching.RedisCache(port=port, timeout=0.1)
+        backend.set("a", b"1")
+
+        self.assertIsNone(backend.get("a"))
+
+    # tests for serialization
+    def test_serialization(self):
+        tmdb_entry = TMDbEntry(category="movie", tmdb_id="11", title="Star Wars", release_year="1977",
+                               description="A long time ago." * 100, poster_id="poster11", language="de")
+        value = [tmdb_entry, {"number": "1", "title": "Pilot"}, "1"]
+
+        data = caching.dumps(value)
+        loaded = caching.loads(data)
+
+        self.assertTrue(data.startswith(b"z"))
+        self.assertEqual(value, loaded)
+        self.assertEqual(tmdb_entry.description, loaded[0].description)
+        self.assertEqual("de", loaded[0].language)
+
+    def test_serialization_unsupported_type(self):
+        self.assertRaises(TypeError, lambda: caching.dumps(object()))
+
+    def test_set_backend_invalid_type(self):
+        self.assertRaises(TypeError, lambda: caching.set_backend({}))
+
+    def test_set_backend(self):
+        backend = caching.MemoryCache()
+
+        with mock.patch.object(default_client(), "cache"), mock.patch.object(default_client(), "cache_ttl"):
+            caching.set_backend(backend, ttl=60)
+
+            self.assertIs(backend, caching.get_backend())
+            self.assertEqual(60, default_client().cache_ttl)
+
+    # tests for cached()
+    def test_cached(self):
+        backend = caching.MemoryCache()
+        client = TMDbClient(cache=backend)
+        page = fixtures.season_page([("1", "Pilot")])
+
+        with mock.patch.object(client, "get", return_value=fixtures.response(page)) as request_get:
+            episodes = client.episodes(series_id="1", season_id="1")
+            episodes.clear()
+
+            self.assertEqual([{"number": "1", "title": "Pilot"}], client.episodes("1", "1"))
+            self.assertEqual([{"number": "1", "title": "Pilot"}], client.episodes("1", season_id="1", language="en"))
+
+        self.assertEqual(1, request_get.call_count)
+        self.assertEqual(1, len(backend))
+
+    def test_cached_per_client(self):
+        page = fixtures.seasons_page("1", ["1"])
+        clients = [TMDbClient(), TMDbClient()]
+
+        with mock.patch.object(TMDbClient, "get", return_value=fixtures.response(page)) as request_get:
+            for client in clients:
+                client.seasons(series_id="1")
+
+        self.assertEqual(2, request_get.call_count)
+
+    def test_make_key(self):
+        key = caching.make_key("search", ["Star Wars", 1])
+
+        self.assertTrue(key.startswith(f"tmdb:{__version__}:search:"))
+        self.assertNotEqual(key, caching.make_key("search", ["Star Wars", 2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from unittest import mock
+
+from .. import *
+from .. import cli
+from . import fixtures
+
+
+class TestTMDbCLI(unittest.TestCase):
+
+    def setUp(self):
+        self.server = fixtures.StubServer({
+            "/search": (200, fixtures.search_page([fixtures.search_card("tv", "1", "Series", release_date="2008")])),
+            "/tv/1/seasons": (200, fixtures.seasons_page("1", ["0", "1"])),
+            "/tv/1/season/1": (200, fixtures.season_page([("1", "Pilot")])),
+            "/t/p/original/poster1.jpg": (200, b"image"),
+        }).start()
+        self.addCleanup(self.server.stop)
+
+        self.client = TMDbClient(base_url=self.server.url)
+        self.addCleanup(self.client.close)
+
+    def run_command(self, argv: list, stdin: str) -> tuple:
+        stdout = io.StringIO()
+        status = cli.run(cli.parser().parse_args(argv), self.client, stdin=io.StringIO(stdin), stdout=stdout)
+
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_search(self):
+        status, rows = self.run_command(["search"], 'Series\n\n{"query": "Series", "language": "de"}\n')
+
+        self.assertEqual(0, status)
+        self.assertEqual(2, len(rows))
+        self.assertEqual("Series", rows[0]["query"])
+        self.assertEqual({"category": "tv", "tmdb_id": "1", "title": "Series", "release_year": "2008",
+                          "description": None, "poster_id": None, "language": "en"}, rows[0]["results"][0])
+        self.assertEqual("de", rows[1]["results"][0]["language"])
+
+    def test_search_fields(self):
+        status, rows = self.run_command(["search", "--fields", "tmdb_id,title"], "Series\n")
+
+        self.assertEqual(0, status)
+        self.assertEqual([{"tmdb_id": "1", "title": "Series"}], rows[0]["results"])
+
+    def test_seasons(self):
+        status, rows = self.run_command(["seasons"], "1\n")
+
+        self.assertEqual([{"series_id": "1", "seasons": ["0", "1"]}], rows)
+
+    def test_order_flags(self):
+        self.assertTrue(cli.parser().parse_args(["search"]).ordered)
+        self.assertTrue(cli.parser().parse_args(["search", "--ordered"]).ordered)
+        self.assertFalse(cli.parser().parse_args(["search", "--unordered"]).ordered)
+
+    def test_episodes(self):
+        status, rows = self.run_command(["episodes", "--unordered"], '1 1\n{"series_id": 1, "season_id": 1}\n')
+
+        self.assertEqual(0, status)
+        self.assertEqual([[{"number": "1", "title": "Pilot"}]] * 2, [row["episodes"] for row in rows])
+
+    def test_posters(self):
+        with tempfile.TemporaryDirectory() as directory:
+            status, rows = self.run_command(["posters", "--output-dir", directory], "poster1\n")
+
+            self.assertEqual(0, status)
+            self.assertEqual(5, rows[0]["bytes"])
+            with open(os.path.join(directory, "poster1.jpg"), "rb") as file:
+                self.assertEqual(b"image", file.read())
+
+    def test_errors(self):
+        status, rows = self.run_command(["episodes"], "1\n1 2\n{broken\n1 1\n")
+
+        self.assertEqual(1, status)
+        self.assertEqual(4, len(rows))
+        self.assertEqual(["error", "error", "error", "episodes"], [list(row)[-1] for row in rows])
+        self.assertEqual("1", rows[0]["input"])
+
+    def test_invalid_arguments(self):
+        with mock.patch("sys.stderr", io.StringIO()):
+            self.assertRaises(SystemExit, lambda: cli.main(["search", "--workers", "0"]))
+            self.assertRaises(SystemExit, lambda: cli.main(["posters"]))
+
+    # tests for stream()
+    def test_stream_ordered(self):
+        results = list(cli.stream(lambda job: job * 2, range(100), workers=4))
+
+        self.assertEqual([(job, job * 2, None) for job in range(100)], results)
+
+    def test_stream_unordered(self):
+        first = threading.Event()
+
+        def function(job: int) -> int:
+            # the first job completes last
+            if job == 0:
+                first.wait(5)
+            elif job == 9:
+                first.set()
+            return job
+
+        results = [job for job, _, _ in cli.stream(function, range(10), workers=4, ordered=False)]
+
+        self.assertEqual(set(range(10)), set(results))
+        self.assertNotEqual(0, results[0])
+
+    def test_stream_errors(self):
+        def function(job: int) -> int:
+            if job == 1:
+                raise ValueError("failed")
+            return job
+
+        results = list(cli.stream(function, range(3), workers=2))
+
+        self.assertEqual([0, None, 2], [result for _, result, _ in results])
+        self.assertIsInstance(results[1][2], ValueError)
+
+    def test_stream_reads_input_lazily(self):
+        consumed = []
+
+        def jobs():
+            for job in range(1000):
+                consumed.append(job)
+                yield job
+
+        for job, _, _ in cli.stream(lambda job: job, jobs(), workers=2):
+            # at most 2 * workers jobs are read ahead
+            self.assertLessEqual(len(consumed), job + 1 + 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
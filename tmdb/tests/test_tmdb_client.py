@@ -0,0 +1,112 @@
+import gc
+import threading
+import unittest
+
+from unittest import mock
+
+from .. import *
+from . import fixtures
+
+
+class TestTMDbClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = fixtures.StubServer({
+            "/search": (200, fixtures.search_page([fixtures.search_card("tv", "1", "Series", poster_id="poster1")])),
+            "/tv/1/seasons": (200, fixtures.seasons_page("1", ["0", "1", "2"])),
+            "/tv/1/season/1": (200, fixtures.season_page([("1", "Pilot")])),
+            "/t/p/w94_and_h141_bestv2/poster1.jpg": (200, b"image"),
+        }).start()
+        self.addCleanup(self.server.stop)
+
+        self.client = TMDbClient(base_url=self.server.url)
+        self.addCleanup(self.client.close)
+
+    def test_search(self):
+        search_results = self.client.search(query="Series")
+
+        self.assertEqual([TMDbEntry(category="tv", tmdb_id="1")], search_results)
+        self.assertIs(self.client, search_results[0].client)
+
+    def test_entry_follow_up_requests_use_client(self):
+        tmdb_entry = self.client.search(query="Series")[0]
+
+        self.assertEqual(["0", "1", "2"], tmdb_entry.seasons())
+        self.assertEqual([{"number": "1", "title": "Pilot"}], tmdb_entry.episodes(season_id="1"))
+        self.assertEqual(b"image", tmdb_entry.poster(max_width=90).getvalue())
+
+    def test_number_of_seasons(self):
+        self.assertEqual(2, self.client.number_of_seasons(series_id="1"))
+        self.assertEqual(2, self.client.number_of_seasons(series_id="1"))
+
+    def test_clients_are_independent(self):
+        other_server = fixtures.StubServer({"/search": (200, fixtures.search_page([]))}).start()
+        self.addCleanup(other_server.stop)
+
+        with TMDbClient(base_url=other_server.url) as other_client:
+            self.assertEqual([], other_client.search(query="Series"))
+
+        self.assertEqual(1, len(self.client.search(query="Series")))
+
+    def test_concurrent_requests(self):
+        errors = []
+
+        def search(number: int):
+            try:
+                self.assertEqual(1, len(self.client.search(query=f"Series {number}")))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=search, args=(number,)) for number in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        self.assertEqual(16, len(self.server.requests))
+
+    def test_sessions_of_exited_threads_are_released(self):
+        for number in range(10):
+            self.client.search_multilang(query=f"Series {number}", languages=["en", "de", "fr", "es"])
+
+        gc.collect()
+        self.assertEqual(0, len(self.client._sessions))
+
+        self.client.search(query="Series")
+        self.assertEqual(1, len(self.client._sessions))
+
+    def test_parser(self):
+        client = TMDbClient(parser="html.parser")
+
+        self.assertEqual("Title", client.parse("<h2>Title</h2>").find("h2").get_text())
+
+    # tests for the default client
+    def test_default_client(self):
+        self.assertIs(default_client(), default_client())
+        self.assertIs(default_client(), TMDbEntry().client)
+
+    def test_set_default_client(self):
+        previous = default_client()
+        self.addCleanup(set_default_client, previous)
+
+        set_default_client(self.client)
+
+        self.assertEqual(["0", "1", "2"], API.TV.seasons(series_id="1"))
+        self.assertTrue(Request.get(path="/search"))
+
+        set_default_client(None)
+        self.assertIsNot(self.client, default_client())
+
+    def test_set_default_client_invalid_type(self):
+        self.assertRaises(TypeError, lambda: set_default_client(object()))
+
+    def test_api_delegates_to_default_client(self):
+        with mock.patch.object(default_client(), "episodes", return_value=[]) as episodes:
+            API.TV.episodes(series_id="1", season_id="1", language="de")
+
+        episodes.assert_called_once_with(series_id="1", season_id="1", language="de")
+
+
+if __name__ == '__main__':
+    unittest.main()
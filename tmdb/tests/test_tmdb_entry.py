@@ -1,4 +1,7 @@
 import unittest
+
+from unittest import mock
+
 from .. import *
 
 
@@ -50,6 +53,23 @@ class TestTMDbEntry(unittest.TestCase):
 
         self.assertEqual(tmdb_entry_1, tmdb_entry_2)
 
+    def test_equals_other_type(self):
+        self.assertNotEqual(TMDbEntry(category="movie", tmdb_id="1"), ("movie", "1"))
+
+    # tests for __hash__()
+    def test_hash_equal_entries(self):
+        tmdb_entry_1 = TMDbEntry(category="movie", tmdb_id="1", title="The Movie", language="en")
+        tmdb_entry_2 = TMDbEntry(category="movie", tmdb_id="1", title="Der Film", language="de")
+
+        self.assertEqual(hash(tmdb_entry_1), hash(tmdb_entry_2))
+        self.assertEqual(1, len({tmdb_entry_1, tmdb_entry_2}))
+
+    def test_hash_deduplicate(self):
+        tmdb_entries = [TMDbEntry(category="movie", tmdb_id="1"), TMDbEntry(category="tv", tmdb_id="1"),
+                        TMDbEntry(category="movie", tmdb_id="1")]
+
+        self.assertEqual(tmdb_entries[:2], list(dict.fromkeys(tmdb_entries)))
+
     # tests for category attribute
     def test_category_movie(self):
         tmdb_entry = TMDbEntry(category="movie")
@@ -154,6 +174,18 @@ class TestTMDbEntry(unittest.TestCase):
 
         self.assertIsNone(tmdb_entry.poster_id)
 
+    # tests for poster_variants attribute
+    def test_poster_variants_tuple(self):
+        tmdb_entry = TMDbEntry(poster_variants=("w94_and_h141_bestv2",))
+
+        self.assertEqual(("w94_and_h141_bestv2",), tmdb_entry.poster_variants)
+
+    def test_poster_variants_invalid_type(self):
+        self.assertRaises(TypeError, lambda: TMDbEntry(poster_variants=["w94_and_h141_bestv2"]))
+
+    def test_poster_variants_default(self):
+        self.assertEqual((), TMDbEntry().poster_variants)
+
     # tests for language attribute
     def test_language_string(self):
         tmdb_entry = TMDbEntry(language="en")
@@ -275,6 +307,18 @@ class TestTMDbEntry(unittest.TestCase):
 
         self.assertIsNone(tmdb_entry.poster())
 
+    def test_poster_max_width(self):
+        tmdb_entry = TMDbEntry(poster_id="mqGTDn6c5wy4Bwf6DR7eZeO7c5d", poster_variants=("w188_and_h282_bestv2",))
+
+        with mock.patch.object(TMDbClient, "image", return_value=io.BytesIO()) as request_image:
+            tmdb_entry.poster(max_width=180)
+            tmdb_entry.poster(max_width=1000)
+
+        # the card variant covers the box and is barely larger than w185
+        self.assertEqual([mock.call(file_path="/t/p/w188_and_h282_bestv2/mqGTDn6c5wy4Bwf6DR7eZeO7c5d.jpg"),
+                          mock.call(file_path="/t/p/original/mqGTDn6c5wy4Bwf6DR7eZeO7c5d.jpg")],
+                         request_image.call_args_list)
+
     def test_poster_invalid_resolution(self):
         tmdb_entry = TMDbEntry(poster_id="mqGTDn6c5wy4Bwf6DR7eZeO7c5d")
 
@@ -0,0 +1,153 @@
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from collections import Counter
+
+from .. import *
+from .. import exports
+from . import fixtures
+
+
+def export(rows: list) -> bytes:
+    """ Returns a gzipped ID export. """
+
+    return gzip.compress("".join(json.dumps(row) + "\n" for row in rows).encode("utf-8"))
+
+
+class TestTMDbExports(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        self.store = exports.ExportStore(os.path.join(self.directory, "catalog.sqlite"))
+        self.addCleanup(self.store.close)
+
+    def write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as file:
+            file.write(data)
+
+        return path
+
+    def test_export_url(self):
+        self.assertEqual("http://files.tmdb.org/p/exports/movie_ids_05_01_2024.json.gz",
+                         exports.export_url("movie", datetime.date(2024, 5, 1)))
+        self.assertEqual("http://files.tmdb.org/p/exports/tv_series_ids_12_31_2023.json.gz",
+                         exports.export_url("tv", datetime.date(2023, 12, 31)))
+        self.assertRaises(ValueError, lambda: exports.export_url("person", datetime.date(2024, 5, 1)))
+
+    def test_read_file(self):
+        path = self.write("movie_ids.json.gz", export([{"adult": False, "id": 11, "original_title": "Star Wars"},
+                                                       {"adult": False, "id": 12, "original_title": "Finding Nemo"}]))
+
+        tmdb_entries = list(exports.read(path, category="movie"))
+
+        self.assertEqual([TMDbEntry(category="movie", tmdb_id="11"), TMDbEntry(category="movie", tmdb_id="12")],
+                         tmdb_entries)
+        self.assertEqual("Star Wars", tmdb_entries[0].title)
+
+    def test_read_uncompressed_file(self):
+        path = self.write("tv_series_ids.json", gzip.decompress(export([{"id": 1399, "original_name": "GoT"}])))
+
+        tmdb_entries = list(exports.read(path, category="tv"))
+
+        self.assertEqual("GoT", tmdb_entries[0].title)
+        self.assertTrue(tmdb_entries[0].is_tv())
+
+    def test_read_url(self):
+        server = fixtures.StubServer({"/movie_ids.json.gz": (200, export([{"id": 11, "original_title": "Star Wars"}]))})
+        server.start()
+        self.addCleanup(server.stop)
+
+        tmdb_entries = list(exports.read(f"{server.url}/movie_ids.json.gz", category="movie"))
+
+        self.assertEqual([TMDbEntry(category="movie", tmdb_id="11")], tmdb_entries)
+
+    def test_read_url_not_found(self):
+        server = fixtures.StubServer().start()
+        self.addCleanup(server.stop)
+
+        self.assertRaises(Exception, lambda: list(exports.read(f"{server.url}/missing.json.gz", category="movie")))
+
+    def test_read_skips_invalid_lines(self):
+        data = gzip.decompress(export([{"id": 11, "original_title": "Star Wars"}])) + b'{"original_title": "No id"}\n'
+        path = self.write("movie_ids.json.gz", gzip.compress(data + b'{"id": 12, "original_ti'))
+        statistics = Counter()
+
+        tmdb_entries = list(exports.read(path, category="movie", statistics=statistics))
+
+        self.assertEqual(1, len(tmdb_entries))
+        self.assertEqual(Counter(lines=3, skipped=2), statistics)
+
+    def test_read_is_lazy(self):
+        path = self.write("movie_ids.json.gz", export([{"id": tmdb_id} for tmdb_id in range(1, 100001)]))
+
+        self.assertEqual("1", next(exports.read(path, category="movie")).tmdb_id)
+
+    # tests for ExportStore
+    def test_ingest(self):
+        statistics = self.store.ingest([TMDbEntry(category="movie", tmdb_id="11", title="Star Wars")], category="movie")
+
+        self.assertEqual(Counter(entries=1, added=1, removed=0), statistics)
+        self.assertEqual(["11"], [tmdb_entry.tmdb_id for tmdb_entry in self.store.entries("movie")])
+        self.assertEqual(1, len(self.store))
+
+    def test_ingest_diff(self):
+        self.store.ingest([TMDbEntry(category="movie", tmdb_id=tmdb_id) for tmdb_id in ("1", "2", "3")],
+                          category="movie")
+        self.store.ingest([TMDbEntry(category="tv", tmdb_id="1")], category="tv")
+
+        statistics = self.store.ingest([TMDbEntry(category="movie", tmdb_id=tmdb_id) for tmdb_id in ("2", "3", "4")],
+                                       category="movie")
+
+        self.assertEqual(Counter(entries=3, added=1, removed=1), statistics)
+        self.assertEqual(["4"], [tmdb_entry.tmdb_id for tmdb_entry in self.store.added("movie")])
+        self.assertEqual(["1"], [tmdb_entry.tmdb_id for tmdb_entry in self.store.removed("movie")])
+
+        # other categories are not affected
+        self.assertEqual(["1"], [tmdb_entry.tmdb_id for tmdb_entry in self.store.entries("tv")])
+
+    def test_ingest_updates_titles(self):
+        self.store.ingest([TMDbEntry(category="movie", tmdb_id="11", title="Star Wars")], category="movie")
+        self.store.ingest([TMDbEntry(category="movie", tmdb_id="11", title="Star Wars: A New Hope")], category="movie")
+
+        self.assertEqual("Star Wars: A New Hope", next(self.store.entries("movie")).title)
+        self.assertEqual([], list(self.store.added("movie")))
+
+    def test_ingest_persists(self):
+        path = self.write("movie_ids.json.gz", export([{"id": tmdb_id, "original_title": f"Movie {tmdb_id}"}
+                                                       for tmdb_id in range(1, 25001)]))
+        self.store.ingest(exports.read(path, category="movie"), category="movie")
+        self.store.close()
+
+        with exports.ExportStore(self.store.path) as store:
+            self.assertEqual(25000, len(store))
+            self.assertEqual("Movie 1", next(store.entries("movie")).title)
+
+    def test_ingest_truncated_export(self):
+        self.store.ingest([TMDbEntry(category="movie", tmdb_id=str(tmdb_id)) for tmdb_id in range(1, 25001)],
+                          category="movie")
+
+        data = export([{"id": tmdb_id, "original_title": f"Movie {tmdb_id}"} for tmdb_id in range(2, 25002)])
+        path = self.write("movie_ids.json.gz", data[:len(data) // 2])
+
+        # the ingest is rolled back instead of marking the ids after the truncation as removed
+        self.assertRaises(EOFError, lambda: self.store.ingest(exports.read(path, category="movie"), category="movie"))
+
+        self.assertEqual(25000, len(self.store))
+        self.assertEqual([], list(self.store.removed("movie")))
+        self.assertEqual(25000, sum(1 for _ in self.store.added("movie")))
+        self.assertIsNone(next(self.store.entries("movie")).title)
+
+    def test_ingest_invalid_category(self):
+        self.assertRaises(ValueError, lambda: self.store.ingest([], category="person"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import gc
+import unittest
+
+from .. import *
+from . import fixtures
+
+
+class TestTMDbIdentityMap(unittest.TestCase):
+
+    def setUp(self):
+        self.identity_map = identity.IdentityMap()
+
+    def test_resolve(self):
+        tmdb_entry_1 = TMDbEntry(category="tv", tmdb_id="1", title="Series")
+        tmdb_entry_2 = TMDbEntry(category="tv", tmdb_id="1", title="Series")
+
+        self.assertIs(tmdb_entry_1, self.identity_map.resolve(tmdb_entry_1))
+        self.assertIs(tmdb_entry_1, self.identity_map.resolve(tmdb_entry_2))
+        self.assertIs(tmdb_entry_1, self.identity_map.get("tv", "1"))
+
+    def test_resolve_fills_missing_fields(self):
+        tmdb_entry_1 = self.identity_map.resolve(TMDbEntry(category="tv", tmdb_id="1", title="Series"))
+        self.identity_map.resolve(TMDbEntry(category="tv", tmdb_id="1", title="Other", release_year="2008",
+                                            poster_id="poster", poster_variants=("w94_and_h141_bestv2",)))
+
+        self.assertEqual("Series", tmdb_entry_1.title)
+        self.assertEqual("2008", tmdb_entry_1.release_year)
+        self.assertEqual("poster", tmdb_entry_1.poster_id)
+        self.assertEqual(("w94_and_h141_bestv2",), tmdb_entry_1.poster_variants)
+
+    def test_resolve_by_language(self):
+        tmdb_entry_1 = self.identity_map.resolve(TMDbEntry(category="tv", tmdb_id="1", title="Series", language="en"))
+        tmdb_entry_2 = self.identity_map.resolve(TMDbEntry(category="tv", tmdb_id="1", title="Serie", language="de"))
+
+        self.assertIsNot(tmdb_entry_1, tmdb_entry_2)
+        self.assertEqual("Serie", tmdb_entry_2.title)
+
+    def test_resolve_without_id(self):
+        tmdb_entry = TMDbEntry(title="Series")
+
+        self.assertIs(tmdb_entry, self.identity_map.resolve(tmdb_entry))
+        self.assertEqual(0, len(self.identity_map))
+
+    def test_weak_references(self):
+        self.identity_map.resolve_all([TMDbEntry(category="tv", tmdb_id=str(tmdb_id)) for tmdb_id in range(1, 11)])
+        gc.collect()
+
+        self.assertEqual(0, len(self.identity_map))
+        self.assertIsNone(self.identity_map.get("tv", "1"))
+
+    def test_client_search(self):
+        server = fixtures.StubServer({
+            "/search": lambda count: (200, fixtures.search_page(
+                [fixtures.search_card("tv", "1", "Series"), fixtures.search_card("movie", str(count + 1), "Movie")],
+                next_page=count == 1)),
+        }).start()
+        self.addCleanup(server.stop)
+
+        client = TMDbClient(base_url=server.url, identity_map=self.identity_map)
+        self.addCleanup(client.close)
+
+        search_results = client.search(query="Series", recursive=True, max_pages=2)
+        other_results = client.search(query="Other")
+
+        # the series appears on both pages and in both searches
+        self.assertIs(search_results[0], search_results[2])
+        self.assertIs(search_results[0], other_results[0])
+        self.assertEqual(4, len(set(search_results + other_results)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+import unittest
+
+from .. import *
+from .. import _data
+
+
+class TestTMDbImport(unittest.TestCase):
+
+    # tests for lazy imports
+    def test_import_is_lazy(self):
+        """ Check that importing tmdb does not import the heavy HTTP and HTML parsing dependencies. """
+
+        code = "import sys, tmdb; print(any(m in sys.modules for m in ('requests', 'bs4', 'fake_useragent')))"
+        process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        self.assertEqual("False", process.stdout.strip())
+
+    def test_lazy_attribute(self):
+        """ Check that heavy dependencies are still reachable as attributes of the package. """
+
+        import tmdb
+        import requests
+
+        self.assertIs(requests, tmdb.requests)
+
+    def test_unknown_attribute(self):
+        import tmdb
+
+        self.assertRaises(AttributeError, lambda: tmdb.unknown_attribute)
+
+    # tests for static tables
+    def test_languages_iso_639(self):
+        for language in _data.LANGUAGES:
+            self.assertTrue(re.fullmatch(r"[a-z]{2}", language))
+
+        self.assertEqual(len(set(_data.LANGUAGES)), len(_data.LANGUAGES))
+        self.assertFalse("cn" in _data.LANGUAGES)
+
+    def test_languages_ietf(self):
+        for language in _data.LANGUAGES_IETF:
+            self.assertTrue(re.fullmatch(r"[a-z]{2}-[A-Z]{2}", language))
+
+    def test_user_agents(self):
+        self.assertTrue(all(user_agent.startswith("Mozilla/5.0") for user_agent in _data.USER_AGENTS))
+
+
+if __name__ == '__main__':
+    unittest.main()
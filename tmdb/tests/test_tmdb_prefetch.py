@@ -0,0 +1,119 @@
+import gc
+import threading
+import unittest
+
+from .. import *
+from .. import prefetch
+from . import fixtures
+
+
+class TestTMDbPrefetch(unittest.TestCase):
+
+    def setUp(self):
+        cards = [fixtures.search_card("tv", "1", "Series", poster_id="poster1"),
+                 fixtures.search_card("movie", "2", "Movie", poster_id="poster2"),
+                 fixtures.search_card("tv", "3", "Other Series")]
+
+        self.server = fixtures.StubServer({
+            "/search": (200, fixtures.search_page(cards)),
+            "/tv/1/seasons": (200, fixtures.seasons_page("1", ["1", "2"])),
+            "/tv/3/seasons": (200, fixtures.seasons_page("3", ["1"])),
+            "/tv/1/season/1": (200, fixtures.season_page([("1", "Pilot")])),
+            "/tv/3/season/1": (200, fixtures.season_page([("1", "First")])),
+            "/t/p/w150_and_h225_bestv2/poster1.jpg": (200, b"poster1"),
+            "/t/p/w150_and_h225_bestv2/poster2.jpg": (200, b"poster2"),
+        }).start()
+        self.addCleanup(self.server.stop)
+
+        self.client = TMDbClient(base_url=self.server.url)
+        self.addCleanup(self.client.close)
+
+    def test_follow_up_calls_use_prefetched_data(self):
+        search_results = self.client.search(query="Star", prefetch=("posters:low", "seasons", "episodes:1"))
+        statistics = search_results.prefetch.wait(timeout=5)
+
+        self.assertEqual(6, statistics["sent"])
+        requests_sent = len(self.server.requests)
+
+        self.assertEqual(b"poster1", search_results[0].poster("low").getvalue())
+        self.assertEqual(b"poster2", search_results[1].poster("low").getvalue())
+        self.assertEqual(["1", "2"], search_results[0].seasons())
+        self.assertEqual([{"number": "1", "title": "First"}], search_results[2].episodes(season_id="1"))
+
+        self.assertEqual(requests_sent, len(self.server.requests))
+
+    def test_policy_order(self):
+        # the season of "episodes:N" does not depend on the policy items after it
+        search_results = self.client.search(query="Star", prefetch=("episodes:1", "posters:low"))
+        statistics = search_results.prefetch.wait(timeout=5)
+
+        self.assertEqual(4, statistics["sent"])
+        self.assertEqual(0, statistics["failed"])
+        self.assertIn("/tv/3/season/1", [request.split("?")[0] for request in self.server.requests])
+
+    def test_without_prefetch(self):
+        search_results = self.client.search(query="Star")
+
+        self.assertNotIsInstance(search_results, prefetch.SearchResults)
+        self.assertEqual(["/search"], [request.split("?")[0] for request in self.server.requests])
+
+    def test_budget(self):
+        search_results = self.client.search(query="Star", prefetch=("posters", "seasons"), prefetch_budget=2)
+        statistics = search_results.prefetch.wait(timeout=5)
+
+        self.assertEqual(2, statistics["sent"])
+        self.assertEqual(2, statistics["skipped"])
+
+        # the budget is spent on the first result cards
+        self.assertIn("/tv/1/seasons", [request.split("?")[0] for request in self.server.requests])
+        self.assertNotIn("/tv/3/seasons", [request.split("?")[0] for request in self.server.requests])
+
+    def test_cancel_when_results_are_discarded(self):
+        started, released = threading.Event(), threading.Event()
+
+        def delay(count: int) -> float:
+            started.set()
+            released.wait(5)
+            return 0
+
+        self.server.delays["/t/p/w150_and_h225_bestv2/poster1.jpg"] = delay
+
+        client = TMDbClient(base_url=self.server.url, prefetch_workers=1)
+        self.addCleanup(client.close)
+
+        search_results = client.search(query="Star", prefetch=("posters", "seasons"))
+        handle = search_results.prefetch
+        started.wait(5)
+
+        del search_results
+        gc.collect()
+        released.set()
+
+        statistics = handle.wait(timeout=5)
+
+        # only the running fetch is completed
+        self.assertEqual(1, statistics["sent"])
+        self.assertEqual(3, statistics["cancelled"])
+        self.assertTrue(handle.done)
+
+    def test_failed_prefetch(self):
+        del self.server.routes["/tv/1/seasons"]
+
+        search_results = self.client.search(query="Star", prefetch=("seasons",))
+        statistics = search_results.prefetch.wait(timeout=5)
+
+        self.assertEqual(1, statistics["failed"])
+        self.assertEqual(1, statistics["sent"])
+
+    def test_invalid_policy(self):
+        for policy in [("trailers",), ("posters:huge",), ("episodes",), ("seasons:1",)]:
+            with self.subTest(policy=policy):
+                self.assertRaises(ValueError, lambda: self.client.search(query="Star", prefetch=policy))
+
+    def test_parse_policy(self):
+        self.assertEqual([("posters", "low"), ("seasons", ""), ("episodes", "1")],
+                         prefetch.parse_policy(("posters", "seasons", "episodes:1")))
+
+
+if __name__ == '__main__':
+    unittest.main()
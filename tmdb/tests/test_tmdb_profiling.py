@@ -0,0 +1,154 @@
+import threading
+import unittest
+
+from .. import *
+from .. import profiling, resilience
+from . import fixtures
+
+
+class TestTMDbProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.server = fixtures.StubServer({
+            "/search": (200, fixtures.search_page([fixtures.search_card("tv", "1", "Series", poster_id="p1")])),
+            "/tv/1/seasons": (200, fixtures.seasons_page("1", ["1", "2"])),
+            "/t/p/original/p1.jpg": (200, bytes(range(256))),
+        }).start()
+        self.addCleanup(self.server.stop)
+
+    def client(self, **kwargs) -> TMDbClient:
+        self.profiler = profiling.Profiler(**kwargs)
+        client = TMDbClient(base_url=self.server.url, profiler=self.profiler)
+        self.addCleanup(client.close)
+
+        return client
+
+    def test_stages(self):
+        self.client().search(query="Series")
+
+        [call] = self.profiler.slowest()
+        self.assertEqual("search", call.name)
+        self.assertEqual(f"{self.server.url}/search?language=en&page=1&query=Series", call.url)
+        self.assertEqual(200, call.status_code)
+        self.assertEqual(len(fixtures.search_page([fixtures.search_card("tv", "1", "Series", poster_id="p1")])),
+                         call.size)
+        self.assertEqual(set(profiling.STAGES), set(call.stages))
+        self.assertLessEqual(sum(call.stages.values()), call.duration)
+        self.assertIsNone(call.profile)
+
+    def test_get(self):
+        self.client().get(path="/tv/1/seasons")
+
+        [call] = self.profiler.slowest()
+        self.assertEqual("get", call.name)
+        self.assertEqual({"connect", "wait", "transfer"}, set(call.stages))
+        self.assertIn("get", repr(call))
+
+    def test_cache_hits(self):
+        client = self.client()
+        client.seasons(series_id="1")
+        client.seasons(series_id="1")
+
+        self.assertEqual(2, self.profiler.summary()["calls"])
+        self.assertEqual(1, len(self.server.requests))
+
+    def test_image(self):
+        self.client().image(file_path="/t/p/original/p1.jpg")
+
+        [call] = self.profiler.slowest()
+        self.assertEqual("image", call.name)
+        self.assertEqual(256, call.size)
+        self.assertIn("transfer", call.stages)
+
+    def test_hedged_requests(self):
+        self.server.delays["/tv/1/seasons"] = 0.2
+
+        profiler = profiling.Profiler()
+        client = TMDbClient(base_url=self.server.url, profiler=profiler,
+                            hedging=resilience.Hedging(default_delay=0.01))
+        self.addCleanup(client.close)
+
+        client.seasons(series_id="1")
+
+        [call] = profiler.slowest()
+        self.assertGreaterEqual(call.stages["wait"], 0.15)
+
+    def test_capacity_and_threshold(self):
+        profiler = profiling.Profiler(capacity=2, threshold=0.5)
+        for duration in (0.1, 0.6, 0.9, 0.7):
+            call = profiling.Call("get")
+            call.duration = duration
+            profiler.record(call)
+
+        self.assertEqual([0.9, 0.7], [call.duration for call in profiler.slowest()])
+        self.assertEqual(4, profiler.summary()["calls"])
+
+        profiler.clear()
+        self.assertEqual([], profiler.slowest())
+
+        with self.assertRaises(ValueError):
+            profiling.Profiler(capacity=0)
+
+    def test_cprofile(self):
+        client = self.client(profile_threshold=0.0)
+        client.seasons(series_id="1")
+
+        [call] = self.profiler.slowest()
+        self.assertIn("function calls", call.profile)
+        self.assertIn("seasons", call.profile)
+
+        client = self.client(profile_threshold=60.0)
+        client.seasons(series_id="1")
+
+        [call] = self.profiler.slowest()
+        self.assertIsNone(call.profile)
+
+    def test_cprofile_threads(self):
+        self.server.delays["/tv/1/seasons"] = 0.1
+
+        client = self.client(profile_threshold=0.0)
+        errors = []
+
+        def get():
+            try:
+                client.get(path="/tv/1/seasons")
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=get) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        calls = self.profiler.slowest()
+        self.assertEqual([], errors)
+        self.assertEqual(4, len(calls))
+        self.assertGreaterEqual(sum(1 for call in calls if call.profile is not None), 1)
+
+        # the lock is released, later calls are profiled again
+        client.get(path="/tv/1/seasons")
+        self.assertEqual(5, len(self.profiler.slowest()))
+        self.assertIsNotNone(max(self.profiler.slowest(), key=lambda call: call.started).profile)
+
+    def test_threads(self):
+        client = self.client()
+        threads = [threading.Thread(target=client.get, kwargs={"path": "/tv/1/seasons"}) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(8, len(self.profiler.slowest()))
+        self.assertIsNone(profiling.current())
+
+    def test_disabled(self):
+        client = TMDbClient(base_url=self.server.url)
+        self.addCleanup(client.close)
+
+        self.assertEqual(["1", "2"], client.seasons(series_id="1"))
+        self.assertIsNone(profiling.current())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import os
+import tempfile
+import time
+import unittest
+
+from .. import *
+from .. import replay
+from . import fixtures
+
+
+class TestTMDbReplay(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "tmdb.archive")
+
+        self.server = fixtures.StubServer({
+            "/search": (200, fixtures.search_page([fixtures.search_card("tv", "1", "Series " * 100, poster_id="p1")])),
+            "/tv/1/seasons": (200, fixtures.seasons_page("1", ["1", "2"])),
+            "/t/p/original/p1.jpg": (200, bytes(range(256))),
+        }).start()
+        self.addCleanup(self.server.stop)
+
+    def record(self) -> list:
+        with TMDbClient(base_url=self.server.url, transport=replay.Recorder(self.path)) as client:
+            search_results = client.search(query="Series")
+            search_results[0].seasons()
+            search_results[0].poster()
+
+        return search_results
+
+    def replay_client(self, **kwargs) -> TMDbClient:
+        # the server is unreachable, every response must come from the archive
+        client = TMDbClient(base_url="http://127.0.0.1:9", transport=replay.Replayer(self.path, **kwargs))
+        self.addCleanup(client.close)
+
+        return client
+
+    def test_replay(self):
+        recorded = self.record()
+        self.server.requests.clear()
+
+        client = self.replay_client()
+        search_results = client.search(query="Series")
+
+        self.assertEqual(recorded, search_results)
+        self.assertEqual(recorded[0].title, search_results[0].title)
+        self.assertEqual(["1", "2"], search_results[0].seasons())
+        self.assertEqual(bytes(range(256)), search_results[0].poster().getvalue())
+        self.assertEqual([], self.server.requests)
+
+    def test_replay_status_and_headers(self):
+        self.record()
+
+        response = self.replay_client().get(path="/tv/1/seasons")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.headers["Content-Length"], str(len(response.content)))
+        self.assertIn("season/2", response.text)
+
+    def test_replay_miss(self):
+        self.record()
+
+        self.assertRaises(replay.ReplayMissError, lambda: self.replay_client().get(path="/tv/2/seasons"))
+
+    def test_replay_latency(self):
+        self.record()
+
+        client = self.replay_client(latency=lambda key: 0.2 if key.startswith("/search") else 0)
+
+        start = time.monotonic()
+        client.seasons(series_id="1")
+        self.assertLess(time.monotonic() - start, 0.2)
+
+        start = time.monotonic()
+        client.search(query="Series")
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    def test_replay_default_client(self):
+        self.record()
+
+        previous = default_client()
+        self.addCleanup(set_default_client, previous)
+        set_default_client(self.replay_client())
+
+        self.assertEqual(bytes(range(256)), Request.image(file_path="/t/p/original/p1.jpg").getvalue())
+
+    def test_replay_read_only_archive(self):
+        self.record()
+        os.chmod(self.path, 0o444)
+        self.addCleanup(os.chmod, self.path, 0o644)
+
+        client = self.replay_client()
+
+        self.assertEqual("rb", client.transport.archive._file.mode)
+        self.assertEqual(["1", "2"], client.seasons(series_id="1"))
+        self.assertRaises(ValueError, lambda: client.transport.archive.write("/a?", status_code=200, headers={},
+                                                                             body=b""))
+
+    def test_record_decoded_headers(self):
+        # the body of a compressed response is decoded by requests, the recorded headers must match it
+        body = b"<html>" + b"<div>card</div>" * 100 + b"</html>"
+        compressed = fixtures.response(body, headers={"Content-Encoding": "gzip", "Content-Length": "120",
+                                                      "Transfer-Encoding": "chunked", "ETag": '"1"'})
+
+        recorder = replay.Recorder(self.path)
+        recorder.fetch("/search?", lambda: compressed)
+        recorder.close()
+
+        replayer = replay.Replayer(self.path)
+        self.addCleanup(replayer.close)
+        response = replayer.fetch("/search?")
+
+        self.assertEqual({"Content-Length": str(len(body)), "ETag": '"1"'}, dict(response.headers))
+        self.assertEqual(body, response.content)
+
+    def test_replay_head_requests(self):
+        # the original image is requested twice: its size (HEAD) and the image itself (GET)
+        with TMDbClient(base_url=self.server.url, transport=replay.Recorder(self.path)) as client:
+            tmdb_entry = client.search(query="Series")[0]
+            _, recorded = client.posters([tmdb_entry], measure_savings=True)
+
+        client = self.replay_client()
+        images, statistics = client.posters([tmdb_entry], measure_savings=True)
+
+        self.assertEqual(bytes(range(256)), images[0].getvalue())
+        self.assertEqual(256, statistics["bytes_original"])
+        self.assertEqual(recorded, statistics)
+        self.assertEqual("256", client.head(path="/t/p/original/p1.jpg").headers["Content-Length"])
+
+    def test_replay_missing_archive(self):
+        self.assertRaises(FileNotFoundError, lambda: replay.Replayer(self.path))
+
+    # tests for Archive
+    def test_archive_index(self):
+        with replay.Archive(self.path) as archive:
+            for number in range(100):
+                archive.write(f"/tv/{number}/seasons?", status_code=200, headers={}, body=b"x" * number)
+
+            archive.write("/tv/1/seasons?", status_code=404, headers={}, body=b"")
+
+        with replay.Archive(self.path) as archive:
+            self.assertEqual(100, len(archive))
+            self.assertEqual(b"x" * 99, archive.read("/tv/99/seasons?")["body"])
+            self.assertEqual(404, archive.read("/tv/1/seasons?")["status"])
+
+    def test_archive_compression(self):
+        body = b"<html>" + b"<div>card</div>" * 1000 + b"</html>"
+
+        with replay.Archive(self.path) as archive:
+            archive.write("/search?", status_code=200, headers={}, body=body)
+            self.assertEqual(body, archive.read("/search?")["body"])
+
+        self.assertLess(os.path.getsize(self.path), len(body) // 10)
+
+    def test_archive_incomplete_record(self):
+        with replay.Archive(self.path) as archive:
+            archive.write("/a?", status_code=200, headers={}, body=b"a")
+            archive.write("/b?", status_code=200, headers={}, body=b"b")
+
+        # the recording was interrupted in the middle of the last record
+        with open(self.path, "r+b") as file:
+            file.truncate(os.path.getsize(self.path) - 1)
+
+        with replay.Archive(self.path) as archive:
+            self.assertNotIn("/b?", archive)
+            archive.write("/c?", status_code=200, headers={}, body=b"c")
+
+        with replay.Archive(self.path) as archive:
+            self.assertEqual([b"a", b"c"], [archive.read(key)["body"] for key in ("/a?", "/c?")])
+
+    def test_archive_invalid_file(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not an archive")
+
+        self.assertRaises(ValueError, lambda: replay.Archive(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
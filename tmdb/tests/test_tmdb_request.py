@@ -1,3 +1,4 @@
+import requests
 import unittest
 
 from .. import *
@@ -0,0 +1,161 @@
+import requests
+import time
+import unittest
+
+from .. import *
+from .. import resilience
+from . import fixtures
+
+
+class TestResilience(unittest.TestCase):
+
+    def setUp(self):
+        self.server = fixtures.StubServer({"/ok": (200, "ok"), "/fail": (500, "error")}).start()
+        self.addCleanup(self.server.stop)
+
+        self.client = TMDbClient(base_url=self.server.url, timeout=(1.0, 1.0))
+        self.addCleanup(self.client.close)
+
+    # tests for timeouts
+    def test_read_timeout(self):
+        self.server.delays["/ok"] = 0.5
+        self.client.timeout = (1.0, 0.1)
+
+        self.assertRaises(requests.Timeout, lambda: self.client.get(path="/ok"))
+
+    # tests for hedged requests
+    def test_hedged_request(self):
+        """ The first request stalls, the duplicate request answers immediately. """
+
+        self.server.delays["/ok"] = lambda count: 2.0 if count == 1 else 0.0
+        self.client.hedging = resilience.Hedging(default_delay=0.1)
+
+        start = time.monotonic()
+        response = self.client.get(path="/ok")
+
+        self.assertEqual("ok", response.text)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_hedged_request_fast_answer(self):
+        self.client.hedging = resilience.Hedging(default_delay=1.0)
+
+        self.client.get(path="/ok")
+
+        self.assertEqual(1, len(self.server.requests))
+
+    def test_hedging_delay_percentile(self):
+        hedging = resilience.Hedging(percentile=50, min_samples=3, default_delay=5.0)
+        self.assertEqual(5.0, hedging.delay("/search"))
+
+        for seconds in (0.1, 0.2, 0.3, 0.4):
+            hedging.tracker("/search").record(seconds)
+
+        self.assertEqual(0.2, hedging.delay("/search"))
+
+    def test_hedging_invalid_percentile(self):
+        self.assertRaises(ValueError, lambda: resilience.Hedging(percentile=0))
+
+    # tests for circuit breakers
+    def test_circuit_breaker_opens(self):
+        self.client.circuit_breakers = resilience.CircuitBreakers(failure_threshold=2, recovery_time=60)
+
+        for _ in range(2):
+            self.assertRaises(Exception, lambda: self.client.get(path="/fail"))
+
+        self.assertRaises(resilience.CircuitOpenError, lambda: self.client.get(path="/fail"))
+        self.assertEqual(2, len(self.server.requests))
+
+        # other endpoints are not affected
+        self.assertTrue(self.client.get(path="/ok"))
+        self.assertEqual({"/fail": "open", "/ok": "closed"}, self.client.circuit_breakers.states())
+
+    def test_circuit_breaker_recovers(self):
+        self.client.circuit_breakers = resilience.CircuitBreakers(failure_threshold=1, recovery_time=0.1)
+        self.assertRaises(Exception, lambda: self.client.get(path="/fail"))
+
+        self.server.routes["/fail"] = (200, "recovered")
+        time.sleep(0.15)
+
+        self.assertEqual("recovered", self.client.get(path="/fail").text)
+        self.assertEqual("closed", self.client.circuit_breakers["/fail"].state)
+
+    def test_circuit_breaker_half_open_failure(self):
+        breaker = resilience.CircuitBreaker(failure_threshold=1, recovery_time=0.05)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEqual("open", breaker.state)
+
+    def test_circuit_breaker_half_open_transport_error(self):
+        """ An error that is not a requests exception ends the trial request as well. """
+
+        class FailingTransport:
+            failures = 1
+
+            def fetch(self, key, send):
+                if self.failures:
+                    self.failures -= 1
+                    raise LookupError("No response for this request was recorded.")
+                return send()
+
+            def close(self):
+                pass
+
+        self.client.circuit_breakers = resilience.CircuitBreakers(failure_threshold=1, recovery_time=0.05)
+        self.assertRaises(Exception, lambda: self.client.get(path="/fail"))
+        self.server.routes["/fail"] = (200, "recovered")
+
+        self.client.transport = FailingTransport()
+        time.sleep(0.06)
+        self.assertRaises(LookupError, lambda: self.client.get(path="/fail"))
+        self.assertEqual("open", self.client.circuit_breakers["/fail"].state)
+
+        time.sleep(0.06)
+        self.assertEqual("recovered", self.client.get(path="/fail").text)
+        self.assertEqual("closed", self.client.circuit_breakers["/fail"].state)
+
+    def test_circuit_breaker_stale_cache(self):
+        """ While the circuit is open, expired cached values are returned. """
+
+        self.server.routes["/tv/1/seasons"] = (200, fixtures.seasons_page("1", ["1"]))
+        self.client.circuit_breakers = resilience.CircuitBreakers(failure_threshold=1, recovery_time=60)
+
+        self.client.cache_ttl = 0.05
+        self.assertEqual(["1"], self.client.seasons(series_id="1"))
+
+        self.server.routes["/tv/1/seasons"] = (500, "error")
+        time.sleep(0.06)
+        self.assertRaises(Exception, lambda: self.client.seasons(series_id="1"))
+
+        self.assertEqual(["1"], self.client.seasons(series_id="1"))
+
+    # tests for rate limiting
+    def test_rate_limit(self):
+        client = TMDbClient(base_url=self.server.url, rate_limit=20)
+        self.addCleanup(client.close)
+
+        start = time.monotonic()
+        for _ in range(5):
+            client.get(path="/ok")
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_rate_limiter_invalid_rate(self):
+        self.assertRaises(ValueError, lambda: resilience.RateLimiter(rate=0))
+
+    # tests for endpoint()
+    def test_endpoint(self):
+        self.assertEqual("/tv/{id}/season/{id}", resilience.endpoint("/tv/253-star-trek/season/1"))
+        self.assertEqual("/search", resilience.endpoint("/search"))
+        self.assertEqual("/t/p", resilience.endpoint("/t/p/original/poster.jpg"))
+        self.assertEqual("/", resilience.endpoint(""))
+
+
+if __name__ == '__main__':
+    unittest.main()
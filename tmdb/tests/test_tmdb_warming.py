@@ -0,0 +1,130 @@
+import threading
+import time
+import unittest
+
+from unittest import mock
+
+from .. import *
+from .. import warming
+from . import fixtures
+
+
+class TestTMDbWarming(unittest.TestCase):
+
+    def setUp(self):
+        self.server = fixtures.StubServer({
+            "/movie": (200, fixtures.listing_page([fixtures.listing_card("movie", "11", "Star Wars", "May 25, 1977",
+                                                                         poster_id="poster11")])),
+            "/tv": (200, fixtures.listing_page([fixtures.listing_card("tv", "1", "Series", poster_id="poster1"),
+                                                fixtures.listing_card("tv", "3", "Other Series")])),
+            "/remote/panel": (200, fixtures.listing_page([fixtures.listing_card("tv", "1", "Series")])),
+            "/search": (200, fixtures.search_page([fixtures.search_card("tv", "1", "Series", poster_id="poster1")])),
+            "/tv/1/seasons": (200, fixtures.seasons_page("1", ["1", "2"])),
+            "/tv/3/seasons": (200, fixtures.seasons_page("3", ["1"])),
+            "/tv/1/season/1": (200, fixtures.season_page([("1", "Pilot")])),
+            "/tv/3/season/1": (200, fixtures.season_page([("1", "First")])),
+            "/t/p/w150_and_h225_bestv2/poster11.jpg": (200, b"poster11"),
+            "/t/p/w150_and_h225_bestv2/poster1.jpg": (200, b"poster1"),
+        }).start()
+        self.addCleanup(self.server.stop)
+
+        self.client = TMDbClient(base_url=self.server.url)
+        self.addCleanup(self.client.close)
+
+    def paths(self) -> list:
+        return [request.split("?")[0] for request in self.server.requests]
+
+    def test_listing(self):
+        tmdb_entries = warming.listing(self.client, "popular_movies")
+
+        self.assertEqual([TMDbEntry(category="movie", tmdb_id="11")], tmdb_entries)
+        self.assertEqual(("Star Wars", "1977", "poster11"),
+                         (tmdb_entries[0].title, tmdb_entries[0].release_year, tmdb_entries[0].poster_id))
+
+    def test_listing_invalid_name(self):
+        self.assertRaises(ValueError, lambda: warming.listing(self.client, "upcoming"))
+
+    def test_warm(self):
+        statistics = warming.warm(self.client, top=10)
+
+        # "Series" is listed twice, movie: search + poster, series 1: search, seasons, episodes, poster, series 3: 3
+        self.assertEqual(3, statistics["titles"])
+        self.assertEqual(9, statistics["planned"])
+        self.assertEqual(0, statistics["cached_before"])
+        self.assertEqual(9, statistics["cached_after"])
+        self.assertEqual(3, statistics["titles_covered"])
+        self.assertEqual(0, statistics["failed"])
+
+    def test_warm_improves_hit_rate(self):
+        warming.warm(self.client, top=10)
+        requests_sent = len(self.server.requests)
+
+        search_results = self.client.search(query="Series")
+        search_results[0].seasons()
+        search_results[0].episodes(season_id="1")
+        search_results[0].poster("low")
+
+        self.assertEqual(requests_sent, len(self.server.requests))
+        self.assertEqual(4, self.client.cache_statistics["hits"])
+
+        statistics = warming.warm(self.client, top=10)
+        self.assertEqual(statistics["planned"], statistics["cached_before"])
+
+    def test_cached_without_reading_values(self):
+        warming.warm(self.client, top=10)
+        titles = warming.listing(self.client, "popular_movies") + warming.listing(self.client, "popular_tv")
+        keys = {tmdb_entry: warming.cache_keys(self.client, tmdb_entry) for tmdb_entry in titles}
+
+        # cached values (e.g. poster images) are counted without transferring them
+        with mock.patch.object(self.client.cache, "get", side_effect=AssertionError):
+            self.assertEqual((9, 3), warming._cached(self.client, keys))
+
+    def test_warm_top(self):
+        statistics = warming.warm(self.client, top=1)
+
+        self.assertEqual(1, statistics["titles"])
+        self.assertNotIn("/tv/1/seasons", self.paths())
+
+    def test_warm_request_budget(self):
+        statistics = warming.warm(self.client, top=10, budget_requests=5)
+
+        self.assertLessEqual(statistics["requests"], 5)
+        self.assertLessEqual(len(self.server.requests), 5)
+        self.assertLess(statistics["cached_after"], statistics["planned"])
+
+    def test_warm_time_budget(self):
+        released = threading.Event()
+        self.addCleanup(released.set)
+        self.server.delays["/search"] = lambda count: released.wait(5) and 0
+
+        start = time.monotonic()
+        statistics = warming.warm(self.client, top=10, budget_seconds=0.3, max_workers=1)
+        released.set()
+
+        self.assertLess(time.monotonic() - start, 3)
+        self.assertLess(statistics["cached_after"], statistics["planned"])
+
+    def test_warm_failed_listing(self):
+        del self.server.routes["/movie"]
+
+        statistics = warming.warm(self.client, top=10)
+
+        self.assertEqual(1, statistics["failed"])
+        self.assertEqual(2, statistics["titles"])
+
+    def test_warmer(self):
+        warmer = warming.Warmer(self.client, interval=60, top=10).start()
+        self.addCleanup(warmer.stop)
+
+        deadline = time.monotonic() + 5
+        while warmer.runs == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        warmer.stop(timeout=5)
+
+        self.assertEqual(1, warmer.runs)
+        self.assertEqual(9, warmer.statistics["cached_after"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from .. import *
+from ..watchlist import Watchlist
+from . import fixtures
+
+
+class FakeTMDb:
+    """ Serves season pages from a dictionary and answers conditional requests like TMDb. """
+
+    def __init__(self):
+        self.pages = {}
+        self.paths = []
+
+    def get(self, path="", query="", stream=False, headers=None):
+        self.paths.append(path)
+
+        body = self.pages[path]
+        if isinstance(body, Exception):
+            raise body
+
+        etag = f'"{hash(body)}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return fixtures.response("", status_code=304)
+
+        return fixtures.response(body, headers={"ETag": etag})
+
+
+class TestWatchlist(unittest.TestCase):
+
+    def setUp(self):
+        self.tmdb = FakeTMDb()
+        self.tmdb.pages["/tv/1/seasons"] = fixtures.seasons_page("1", ["1", "2"])
+        self.tmdb.pages["/tv/1/season/1"] = fixtures.season_page([("1", "Pilot"), ("2", "Second")])
+        self.tmdb.pages["/tv/1/season/2"] = fixtures.season_page([("1", "Return")])
+
+        patcher = mock.patch.object(TMDbClient, "get", side_effect=self.tmdb.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_first_sync_adds_all_episodes(self):
+        watchlist = Watchlist(series_ids=["1"])
+
+        changes = watchlist.sync()
+
+        self.assertEqual(3, len(changes))
+        self.assertTrue(all(change["change"] == "added" for change in changes))
+        self.assertEqual([{"number": "1", "title": "Return"}], watchlist.episodes("1", "2"))
+
+    def test_sync_only_polls_seasons_page_and_latest_season(self):
+        watchlist = Watchlist(series_ids=["1"])
+        watchlist.sync()
+        self.tmdb.paths.clear()
+
+        changes = watchlist.sync()
+
+        self.assertEqual([], changes)
+        self.assertEqual(["/tv/1/seasons", "/tv/1/season/2"], self.tmdb.paths)
+        self.assertEqual(2, watchlist.statistics["not_modified"])
+        self.assertEqual(0, watchlist.statistics["parsed"])
+
+    def test_sync_new_and_renamed_episodes(self):
+        watchlist = Watchlist(series_ids=["1"])
+        watchlist.sync()
+
+        self.tmdb.pages["/tv/1/season/2"] = fixtures.season_page([("1", "The Return"), ("2", "Finale")])
+        changes = watchlist.sync()
+
+        self.assertEqual([{"series_id": "1", "season_id": "2", "number": "1", "title": "The Return",
+                           "change": "renamed", "previous_title": "Return"},
+                          {"series_id": "1", "season_id": "2", "number": "2", "title": "Finale",
+                           "change": "added"}], changes)
+
+    def test_sync_new_season_finishes_previous_season(self):
+        watchlist = Watchlist(series_ids=["1"])
+        watchlist.sync()
+
+        self.tmdb.pages["/tv/1/seasons"] = fixtures.seasons_page("1", ["1", "2", "3"])
+        self.tmdb.pages["/tv/1/season/3"] = fixtures.season_page([("1", "New")])
+        watchlist.sync()
+        self.tmdb.paths.clear()
+
+        watchlist.sync()
+
+        self.assertEqual(["/tv/1/seasons", "/tv/1/season/3"], self.tmdb.paths)
+
+    def test_sync_failed_series(self):
+        self.tmdb.pages["/tv/2/seasons"] = fixtures.seasons_page("2", ["1"])
+        self.tmdb.pages["/tv/2/season/1"] = Exception("The resource www.themoviedb.org/tv/2/season/1 does not exist.")
+        watchlist = Watchlist(series_ids=["1", "2"])
+
+        changes = watchlist.sync()
+
+        # the changes of the other series are reported
+        self.assertEqual({"1"}, {change["series_id"] for change in changes})
+        self.assertEqual(3, len(changes))
+        self.assertEqual(1, watchlist.statistics["failed"])
+
+        # the failed series is synced completely once it recovers
+        self.tmdb.pages["/tv/2/season/1"] = fixtures.season_page([("1", "Pilot")])
+        changes = watchlist.sync()
+
+        self.assertEqual([{"series_id": "2", "season_id": "1", "number": "1", "title": "Pilot", "change": "added"}],
+                         changes)
+        self.assertEqual(0, watchlist.statistics["failed"])
+
+    def test_save_and_load(self):
+        watchlist = Watchlist(series_ids=["1"], language="de")
+        watchlist.sync()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "watchlist.json")
+            watchlist.save(path)
+            loaded = Watchlist.load(path)
+
+        self.assertEqual("de", loaded.language)
+        self.assertEqual(["1"], loaded.series_ids)
+        self.assertEqual([], loaded.sync())
+
+    def test_add_invalid_series_id(self):
+        watchlist = Watchlist()
+
+        self.assertRaises(TypeError, lambda: watchlist.add(1))
+        self.assertRaises(ValueError, lambda: watchlist.add("x"))
+
+    def test_invalid_language(self):
+        self.assertRaises(ValueError, lambda: Watchlist(language="roman"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+"""
+Cache warming from the popular and trending listings of TMDb. The titles of the listings are searched and their
+follow-up data (seasons, first-season episodes and low-resolution posters) is fetched into the cache of the client, so
+the first users after a deploy do not wait for live requests:
+
+    import tmdb
+
+    from tmdb import warming
+
+    statistics = warming.warm(top=50, budget_seconds=120, budget_requests=400)
+    print(f"{statistics['cached_after'] / statistics['planned']:.0%} of {statistics['titles']} titles cached "
+          f"(before: {statistics['cached_before'] / statistics['planned']:.0%})")
+
+    # warm the cache every hour
+    warmer = warming.Warmer(interval=3600, top=50).start()
+
+The statistics count the "titles" warmed, the cache values "planned" for them, the values cached before and after
+("cached_before", "cached_after"), the "titles_covered" completely, the "requests" (fetches answered from the cache
+included) and the fetches that "failed". Hits and misses of later calls are counted in the cache_statistics of the
+client.
+"""
+
+import threading
+import time
+
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from . import _extract, caching, prefetch
+
+if TYPE_CHECKING:
+    from . import TMDbEntry
+    from .client import TMDbClient
+
+# listing: (path, query)
+LISTINGS = {
+    "popular_movies": ("/movie", ""),
+    "popular_tv": ("/tv", ""),
+    "trending": ("/remote/panel", "panel=trending_scroller&group=today"),
+}
+
+# follow-up data fetched for every title (see tmdb.prefetch)
+POLICY = ("posters:low", "seasons", "episodes:1")
+
+
+def listing(client: "TMDbClient", name: str, language: str = "en") -> list:
+    """
+    Returns the titles of a popular or trending listing.
+
+    :param client: Client sending the request.
+    :param name: Name of the listing (see LISTINGS).
+    :param language: ISO-639-1 language code.
+    :return: List of entries in listing order.
+    """
+
+    if name not in LISTINGS:
+        raise ValueError(f"Listing must be one of the following: {list(LISTINGS)}.")
+
+    path, query = LISTINGS[name]
+    response = client.get(path=path, query=f"{query}&language={language}" if query else f"language={language}")
+
+    return _extract.listing(client.parse(response.text), language=language)
+
+
+def cache_keys(client: "TMDbClient", tmdb_entry: "TMDbEntry") -> list:
+    """
+    Returns the cache keys of the values warmed for a title.
+
+    :param client: Client whose cache is warmed.
+    :param tmdb_entry: Title.
+    :return: List of cache keys.
+    """
+
+    keys = []
+
+    if tmdb_entry.title is not None:
+        keys.append(client._search.cache_key(query=tmdb_entry.title, language=tmdb_entry.language))
+
+    if tmdb_entry.is_tv():
+        keys.append(client.seasons.cache_key(series_id=tmdb_entry.tmdb_id))
+        keys.append(client.episodes.cache_key(series_id=tmdb_entry.tmdb_id, season_id="1",
+                                              language=tmdb_entry.language))
+
+    if tmdb_entry.poster_id is not None:
+        keys.append(caching.make_key("image", [tmdb_entry._poster_path("low")]))
+
+    return keys
+
+
+def warm(client: "TMDbClient" = None, top: int = 20, listings: tuple = tuple(LISTINGS), language: str = "en",
+         budget_seconds: float = 60.0, budget_requests: int = 200, max_workers: int = 8) -> Counter:
+    """
+    Warms the cache of a client with the top titles of the popular and trending listings. Titles are warmed in listing
+    order until the time or request budget is spent.
+
+    :param client: Client whose cache is warmed (default: the default client).
+    :param top: Number of titles.
+    :param listings: Names of the listings (see LISTINGS).
+    :param language: ISO-639-1 language code.
+    :param budget_seconds: Maximum duration in seconds.
+    :param budget_requests: Maximum number of requests.
+    :param max_workers: Number of concurrent requests.
+    :return: Statistics (see module documentation).
+    """
+
+    from concurrent.futures import ThreadPoolExecutor, wait
+
+    from . import default_client
+
+    client = default_client() if client is None else client
+    deadline = time.monotonic() + budget_seconds
+    statistics = Counter()
+
+    # titles of the listings, interleaved so every listing contributes to the top titles
+    listed = []
+    for name in listings:
+        if statistics["requests"] >= budget_requests or time.monotonic() >= deadline:
+            break
+
+        statistics["requests"] += 1
+        try:
+            listed.append(listing(client, name, language=language))
+        except Exception:
+            statistics["failed"] += 1
+
+    titles = list(dict.fromkeys(_interleave(listed)))[:top]
+
+    keys = {tmdb_entry: cache_keys(client, tmdb_entry) for tmdb_entry in titles}
+    statistics["titles"] = len(titles)
+    statistics["planned"] = sum(len(entry_keys) for entry_keys in keys.values())
+    statistics["cached_before"] = _cached(client, keys)[0]
+
+    # running fetches are not waited for when the time budget is spent, they complete in the background
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tmdb-warming")
+    try:
+        # search result pages of the titles
+        searches = [tmdb_entry for tmdb_entry in titles if tmdb_entry.title is not None]
+        searches = searches[:max(0, budget_requests - statistics["requests"])]
+        futures = [executor.submit(client.search, query=tmdb_entry.title, language=tmdb_entry.language)
+                   for tmdb_entry in searches]
+
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        cancelled = sum(1 for future in not_done if future.cancel())
+
+        # searches still running count against the budget
+        statistics["requests"] += len(futures) - cancelled
+        statistics["failed"] += sum(1 for future in done if future.exception() is not None)
+
+        # follow-up data of the titles
+        fetches = prefetch.Prefetch(client, titles, policy=POLICY, executor=executor,
+                                    budget=max(0, budget_requests - statistics["requests"]))
+        fetches.wait(timeout=max(0.0, deadline - time.monotonic()))
+        fetches.cancel()
+
+        statistics["requests"] += fetches.statistics["sent"] + fetches.statistics["failed"]
+        statistics["failed"] += fetches.statistics["failed"]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    statistics["cached_after"], statistics["titles_covered"] = _cached(client, keys)
+
+    return statistics
+
+
+def _interleave(lists: list):
+    from itertools import zip_longest
+
+    for values in zip_longest(*lists):
+        yield from (value for value in values if value is not None)
+
+
+def _cached(client: "TMDbClient", keys: dict) -> tuple:
+    # number of cached values and of titles with all values cached
+    cached, covered = 0, 0
+    for entry_keys in keys.values():
+        entry_cached = sum(1 for key in entry_keys if client.cache.exists(key))
+        cached += entry_cached
+        covered += entry_cached == len(entry_keys)
+
+    return cached, covered
+
+
+class Warmer:
+    """ Warms the cache of a client in a background thread at a fixed interval. """
+
+    def __init__(self, client: "TMDbClient" = None, interval: float = 3600.0, **options):
+        """
+        :param client: Client whose cache is warmed (default: the default client).
+        :param interval: Seconds between the starts of two runs.
+        :param options: Options of warm() (e.g. top, budget_seconds, budget_requests).
+        """
+
+        self.client = client
+        self.interval = interval
+        self.options = options
+        self.runs = 0
+        self.statistics = Counter()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self) -> "Warmer":
+        """ Starts warming (the first run starts immediately). """
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="tmdb-warmer", daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Stops warming after the current run.
+
+        :param timeout: Maximum time to wait for the current run in seconds.
+        """
+
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            start = time.monotonic()
+
+            try:
+                self.statistics = warm(self.client, **self.options)
+            except Exception:
+                self.statistics = Counter(failed=1)
+
+            self.runs += 1
+            self._stopped.wait(max(0.0, self.interval - (time.monotonic() - start)))
@@ -0,0 +1,241 @@
+import copy
+import hashlib
+import json
+import os
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+from . import TMDbClient, _data, _extract, default_client
+
+if TYPE_CHECKING:
+    import requests
+
+
+class Watchlist:
+    """
+    Incremental synchronization of the episodes of a list of TV series.
+
+    For every series the watchlist stores fingerprints and HTTP validators (ETag / Last-Modified) of the seasons page
+    and of every season page. A sync sends conditional requests and only parses pages whose content changed. Seasons
+    that are followed by a newer season are polled one last time and then considered finished, so a regular sync only
+    requests the seasons page and the latest season of every series.
+    """
+
+    def __init__(self, series_ids: list = (), language: str = "en", client: TMDbClient = None):
+        """
+        :param series_ids: The TMDb ids of the TV series.
+        :param language: ISO-639-1 language code of the episode titles.
+        :param client: Client sending the requests (default: the default client).
+        """
+
+        if language not in _data.LANGUAGES:
+            raise ValueError(f"Watchlist language must be one of the following: {list(_data.LANGUAGES)}.")
+
+        self.language = language
+        self.client = client
+        self.statistics = Counter()
+        self._series = {}
+
+        for series_id in series_ids:
+            self.add(series_id)
+
+    def __contains__(self, series_id: str) -> bool:
+        return series_id in self._series
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @property
+    def series_ids(self) -> list:
+        return list(self._series)
+
+    def add(self, series_id: str) -> None:
+        """
+        Adds a TV series to the watchlist.
+
+        :param series_id: The TMDb id of the TV series.
+        """
+
+        if not isinstance(series_id, str):
+            raise TypeError("Watchlist series_id must be a string.")
+
+        if not series_id.isnumeric() or series_id == "0":
+            raise ValueError("Watchlist series_id must be a positive number.")
+
+        self._series.setdefault(series_id, {"seasons": {}})
+
+    def remove(self, series_id: str) -> None:
+        """
+        Removes a TV series from the watchlist.
+
+        :param series_id: The TMDb id of the TV series.
+        """
+
+        self._series.pop(series_id, None)
+
+    def episodes(self, series_id: str, season_id: str) -> list:
+        """
+        Returns the episodes of a season as of the last sync.
+
+        :param series_id: The TMDb id of the TV series.
+        :param season_id: The season id.
+        :return: List of episodes.
+        """
+
+        season = self._series[series_id]["seasons"].get(season_id)
+
+        return [] if season is None else list(season["episodes"])
+
+    def sync(self, max_workers: int = 8) -> list:
+        """
+        Synchronizes all TV series on the watchlist. The first sync of a series reports all of its episodes as added.
+
+        A series that fails to sync (e.g. on a timeout) keeps its previous state, so its changes are reported by a
+        later sync. Failed series are counted in statistics["failed"].
+
+        :param max_workers: Maximum number of TV series synchronized concurrently.
+        :return: List of changes as dictionaries with the keys "series_id", "season_id", "number", "title", "change"
+                 ("added" or "renamed") and, for renamed episodes, "previous_title".
+        """
+
+        self.statistics.clear()
+        client = default_client() if self.client is None else self.client
+
+        def sync_series(series_id: str, state: dict) -> tuple:
+            # the series is synced on a copy of its state, which replaces the state only on success
+            statistics = Counter()
+            try:
+                series_state = copy.deepcopy(state)
+                return self._sync_series(client, series_id, series_state, statistics), series_state, statistics
+            except Exception:
+                statistics["failed"] += 1
+                return [], None, statistics
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda item: (item[0], *sync_series(*item)), self._series.items()))
+
+        changes = []
+        for series_id, series_changes, series_state, statistics in results:
+            if series_state is not None and series_id in self._series:
+                self._series[series_id] = series_state
+                changes += series_changes
+
+            self.statistics.update(statistics)
+
+        return changes
+
+    def _sync_series(self, client: TMDbClient, series_id: str, state: dict, statistics: Counter) -> list:
+        changes = []
+
+        # seasons page, only parsed if its content changed
+        response = self._fetch(client, path=f"/tv/{series_id}/seasons", query="", state=state, statistics=statistics)
+        if response is None:
+            season_ids = list(state["seasons"])
+        else:
+            season_ids = _extract.seasons(client.parse(response.text))
+
+        if not season_ids:
+            return changes
+
+        latest = max(season_ids, key=int)
+        for season_id in season_ids:
+            season = state["seasons"].get(season_id)
+
+            # skip seasons that were synced after a newer season had been released
+            if season is not None and season["finished"]:
+                statistics["skipped"] += 1
+                continue
+
+            if season is None:
+                season = state["seasons"][season_id] = {"episodes": [], "finished": False}
+
+            response = self._fetch(client, path=f"/tv/{series_id}/season/{season_id}",
+                                   query=f"language={self.language}", state=season, statistics=statistics)
+            if response is not None:
+                episodes = _extract.episodes(client.parse(response.text))
+                changes += self._diff(series_id, season_id, season["episodes"], episodes)
+                season["episodes"] = episodes
+
+            season["finished"] = season_id != latest
+
+        return changes
+
+    @staticmethod
+    def _fetch(client: TMDbClient, path: str, query: str, state: dict,
+               statistics: Counter) -> Optional["requests.Response"]:
+        # send stored validators, so TMDb can answer with "304 Not Modified"
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        response = client.get(path=path, query=query, headers=headers)
+        statistics["requests"] += 1
+
+        if response.status_code == 304:
+            statistics["not_modified"] += 1
+            return None
+
+        state["etag"] = response.headers.get("ETag")
+        state["last_modified"] = response.headers.get("Last-Modified")
+
+        # compare the fingerprint of the page for servers without validator support
+        fingerprint = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        if fingerprint == state.get("fingerprint"):
+            statistics["unchanged"] += 1
+            return None
+
+        state["fingerprint"] = fingerprint
+        statistics["parsed"] += 1
+
+        return response
+
+    @staticmethod
+    def _diff(series_id: str, season_id: str, previous_episodes: list, episodes: list) -> list:
+        previous_titles = {episode["number"]: episode["title"] for episode in previous_episodes}
+
+        changes = []
+        for episode in episodes:
+            change = {"series_id": series_id, "season_id": season_id, **episode}
+
+            if episode["number"] not in previous_titles:
+                changes.append({**change, "change": "added"})
+            elif episode["title"] != previous_titles[episode["number"]]:
+                changes.append({**change, "change": "renamed", "previous_title": previous_titles[episode["number"]]})
+
+        return changes
+
+    def save(self, path: str) -> None:
+        """
+        Saves the watchlist including all fingerprints to a JSON file.
+
+        :param path: Path to the file.
+        """
+
+        # write to a temporary file first, so an interrupted save does not destroy the previous state
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"language": self.language, "series": self._series}, file, ensure_ascii=False)
+
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str, client: TMDbClient = None) -> "Watchlist":
+        """
+        Loads a watchlist from a JSON file created by save().
+
+        :param path: Path to the file.
+        :param client: Client sending the requests (default: the default client).
+        :return: Watchlist.
+        """
+
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+
+        watchlist = cls(language=data["language"], client=client)
+        watchlist._series = data["series"]
+
+        return watchlist